@@ -0,0 +1,136 @@
+# admission.py
+"""
+Control de admisión global: cuántos `run_pipeline` corren a la vez en el
+proceso y cuánta memoria estimada ocupan, con una cola justa entre
+usuarios.
+
+Cada archivo pide un turno (`request`) con un coste estimado a partir de
+su tamaño. Se admite mientras haya hueco (máximo de ejecuciones y
+presupuesto de memoria); si no, espera. Al liberarse un hueco pasa el
+turno del usuario con menos archivos en marcha (a igualdad, el que lleva
+más tiempo sin ser atendido, y después el más antiguo), así que un lote
+de 30 archivos no bloquea al usuario que sube uno solo.
+
+    ac = AdmissionController(max_running=4, memory_budget=1 * 2**30)
+    t = ac.request("ana", estimate_cost(len(contenido)))
+    t.wait()                        # bloquea hasta ser admitido
+    try: run_pipeline(contenido)
+    finally: ac.release(t)
+"""
+from __future__ import annotations
+
+import itertools, os, threading
+from collections import Counter
+from dataclasses import dataclass, field
+
+# coste estimado de un archivo: fijo (intérprete, openpyxl) + proporcional a la entrada
+BASE_COST = 32 * 2**20
+COST_FACTOR = int(os.environ.get("BID_MEM_FACTOR", 300))    # pico medido ≈ 50-300 × entrada
+
+
+def estimate_cost(size: int) -> int:
+    """Bytes de memoria que se reservan para procesar una entrada de `size` bytes."""
+    return BASE_COST + COST_FACTOR * size
+
+
+@dataclass(eq=False)
+class Ticket:
+    owner: str
+    cost: int
+    seq: int
+    admitted: bool = False
+    done: bool = False
+    _event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """True cuando el turno fue admitido (False si venció `timeout`)."""
+        return self._event.wait(timeout)
+
+
+class AdmissionController:
+    """
+    Parameters
+    ----------
+    max_running : int
+        Ejecuciones simultáneas de `run_pipeline` en todo el proceso.
+    memory_budget : int
+        Suma máxima de `estimate_cost` de las ejecuciones en marcha. Un
+        archivo que por sí solo supera el presupuesto se admite cuando no
+        hay nada más en marcha.
+    """
+
+    def __init__(self, max_running: int = os.cpu_count() or 1, memory_budget: int = 2**30):
+        self.max_running, self.memory_budget = max(1, max_running), memory_budget
+        self._waiting: list[Ticket] = []
+        self._running: list[Ticket] = []
+        self._seq = itertools.count()
+        self._served: dict[str, int] = {}      # owner → nº de la última admisión
+        self._grants = itertools.count()
+        self._lock = threading.Lock()
+
+    # ─────────────────── API ───────────────────────────────────────
+    def request(self, owner: str, cost: int) -> Ticket:
+        """Pone un archivo en la cola; puede quedar admitido en el acto."""
+        with self._lock:
+            ticket = Ticket(owner, cost, next(self._seq))
+            self._waiting.append(ticket)
+            self._grant()
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        """Libera el turno (o lo retira de la cola si aún esperaba). Idempotente."""
+        with self._lock:
+            if ticket.done:
+                return
+            ticket.done = True
+            if ticket in self._running:
+                self._running.remove(ticket)
+            elif ticket in self._waiting:
+                self._waiting.remove(ticket)
+            self._grant()
+
+    def position(self, owner: str) -> int | None:
+        """Puesto (1 = el siguiente) del primer archivo en espera de `owner`, o None."""
+        with self._lock:
+            for pos, ticket in enumerate(self._order(), 1):
+                if ticket.owner == owner:
+                    return pos
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"running": len(self._running), "waiting": len(self._waiting),
+                    "max_running": self.max_running,
+                    "memory_used": sum(t.cost for t in self._running),
+                    "memory_budget": self.memory_budget}
+
+    # ─────────────────── interno (con el lock tomado) ──────────────
+    def _order(self) -> list[Ticket]:
+        """
+        Orden justo de la cola: por archivos del usuario por delante, luego
+        por antigüedad de su última admisión (turno rotatorio) y por llegada.
+        """
+        ahead = Counter(t.owner for t in self._running)
+        ranked = []
+        for t in sorted(self._waiting, key=lambda t: t.seq):
+            ranked.append((ahead[t.owner], self._served.get(t.owner, -1), t.seq, t))
+            ahead[t.owner] += 1
+        return [t for *_, t in sorted(ranked, key=lambda r: r[:3])]
+
+    def _fits(self, ticket: Ticket) -> bool:
+        if not self._running:
+            return True
+        return (len(self._running) < self.max_running
+                and sum(t.cost for t in self._running) + ticket.cost <= self.memory_budget)
+
+    def _grant(self) -> None:
+        # en orden estricto: si el siguiente no cabe, nadie se le adelanta
+        while self._waiting:
+            ticket = self._order()[0]
+            if not self._fits(ticket):
+                break
+            self._waiting.remove(ticket)
+            self._running.append(ticket)
+            self._served[ticket.owner] = next(self._grants)
+            ticket.admitted = True
+            ticket._event.set()
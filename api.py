@@ -0,0 +1,282 @@
+# api.py
+"""
+API HTTP mínima (solo biblioteca estándar) para generar plantillas sin
+pasar por la interfaz de Streamlit.
+
+    python api.py --port 8000 -j 4
+
+    GET  /health                       → {"status": "ok", …}
+    POST /generate  (cuerpo = .xlsx)   → resultado .xlsx
+    POST /generate  (multipart, varios archivos) → ZIP con un resultado por archivo
+
+    curl --data-binary @proyecto.xlsx localhost:8000/generate -o resultado.xlsx
+    curl -F f=@a.xlsx -F f=@b.xlsx localhost:8000/generate -o plantillas.zip
+    curl --data-binary @proyecto.xlsx "localhost:8000/generate?templates=C,D&split=1" -o p.zip
+
+Límites: BID_API_MAX_MB por petición (413 si se supera) y como mucho
+BID_API_CONCURRENCY peticiones procesándose (503 + Retry-After para el
+resto). Si se define BID_API_TOKEN, hay que enviar `Authorization: Bearer …`.
+Opciones en la URL: templates, split, compression y engine (ver parse_options).
+Las respuestas se envían por trozos: el ZIP empieza a salir en cuanto
+termina el primer archivo.
+"""
+from __future__ import annotations
+
+import argparse, hmac, json, os, sys, threading
+from email.parser import BytesParser
+from email.policy import default as email_policy
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import PurePath
+from urllib.parse import parse_qs, urlsplit
+
+from batch import FAILED, default_workers, make_pool, run_batch
+from bundle import ZipBundle
+from cache import ResultCache, code_version
+from jobs import output_name
+from pipeline import ENGINES, select_templates
+from writer import resolve_levels
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CHUNK = 64 * 1024
+
+
+class _Chunked:
+    """Escritor HTTP/1.1 'Transfer-Encoding: chunked' (sin tell: zipfile lo trata como flujo)."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, data) -> int:
+        for i in range(0, len(data), CHUNK):
+            part = data[i:i + CHUNK]
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+        return len(data)
+
+    def flush(self) -> None:
+        self.wfile.flush()
+
+    def close(self) -> None:
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def parse_options(query: str) -> dict:
+    """?templates=C,D&split=1&compression=fast → argumentos de run_pipeline (o ValueError)."""
+    qs = {k: v[-1] for k, v in parse_qs(query).items()}
+    options = {}
+    if "templates" in qs:
+        options["templates"] = select_templates(qs["templates"])
+    if qs.get("split", "0").lower() in ("1", "true", "yes"):
+        options["split"] = True
+    if "compression" in qs:
+        resolve_levels(qs["compression"])
+        options["compression"] = qs["compression"]
+    if "engine" in qs:
+        if qs["engine"] not in ENGINES:
+            raise ValueError(f"motor desconocido: {qs['engine']} (válidos: {', '.join(ENGINES)})")
+        options["engine"] = qs["engine"]
+    return options
+
+
+def parse_files(content_type: str, body: bytes) -> list[tuple[str, bytes]]:
+    """Cuerpo de la petición → [(nombre, contenido)]: multipart o un único .xlsx."""
+    if not content_type.startswith("multipart/form-data"):
+        return [("proyecto.xlsx", body)]
+    msg = BytesParser(policy=email_policy).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    # solo el nombre: el del cliente puede traer rutas ("../x.xlsx", "a/b.xlsx")
+    return [(PurePath(part.get_filename().replace("\\", "/")).name or f"archivo{i}.xlsx",
+             part.get_payload(decode=True))
+            for i, part in enumerate(msg.iter_parts(), 1)
+            if part.get_content_disposition() == "form-data" and part.get_filename()]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "BIDTemplates"
+    timeout = 120                                   # clientes lentos no retienen el hilo
+
+    # ─────────────────── rutas ─────────────────────────────────────
+    def do_GET(self):
+        if self.path.rstrip("/") != "/health":
+            return self._json(HTTPStatus.NOT_FOUND, {"error": "ruta desconocida"})
+        srv = self.server
+        self._json(HTTPStatus.OK, {
+            "status": "ok", "version": srv.version,
+            "busy": srv.busy, "capacity": srv.capacity,
+            "cache": {"hits": srv.cache.stats.hits, "misses": srv.cache.stats.misses},
+        })
+
+    def do_POST(self):
+        # las respuestas antes de leer el cuerpo cierran la conexión: si no,
+        # con keep-alive el cuerpo sin leer se tomaría por la siguiente petición
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/generate":
+            return self._reject(HTTPStatus.NOT_FOUND, {"error": "ruta desconocida"})
+        if not self._authorized():
+            return self._reject(HTTPStatus.UNAUTHORIZED, {"error": "token inválido"})
+        try:
+            options = parse_options(url.query)
+        except ValueError as exc:
+            return self._reject(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+        length = self.headers.get("Content-Length", "")
+        if not length.isdigit():
+            return self._reject(HTTPStatus.LENGTH_REQUIRED, {"error": "falta Content-Length"})
+        if int(length) > self.server.max_bytes:
+            return self._reject(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                {"error": f"máximo {self.server.max_bytes // 2**20} MB por petición"})
+        if not self.server.acquire():
+            return self._reject(HTTPStatus.SERVICE_UNAVAILABLE,
+                                {"error": "servidor ocupado, reintente"}, {"Retry-After": "5"})
+        try:
+            body = self.rfile.read(int(length))
+            if len(body) < int(length):             # el cliente cortó o se agotó el tiempo
+                return self._reject(HTTPStatus.BAD_REQUEST, {"error": "cuerpo incompleto"})
+            files = parse_files(self.headers.get("Content-Type", ""), body)
+            del body
+            if not files:
+                return self._json(HTTPStatus.BAD_REQUEST, {"error": "no se recibió ningún .xlsx"})
+            if len(files) == 1 and not self.headers.get("Content-Type", "").startswith("multipart/"):
+                self._single(files[0], options)
+            else:
+                self._zip(files, options)
+        finally:
+            self.server.release()
+
+    # ─────────────────── respuestas ────────────────────────────────
+    def _single(self, file: tuple[str, bytes], options: dict) -> None:
+        it = run_batch([file], workers=self.server.workers, executor=self.server.pool,
+                       cache=self.server.cache, options=options)[0]
+        if it.status == FAILED:
+            return self._json(HTTPStatus.UNPROCESSABLE_ENTITY,
+                              {"error": it.error, **({"problems": it.problems} if it.problems else {})})
+        name, data = output_name(it.name, it.result[0]), it.result[1]
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/zip" if name.endswith(".zip") else XLSX_MIME)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Content-Disposition", f'attachment; filename="{name}"')
+        self.end_headers()
+        for i in range(0, len(data), CHUNK):
+            self.wfile.write(data[i:i + CHUNK])
+
+    def _zip(self, files: list[tuple[str, bytes]], options: dict) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Content-Disposition", 'attachment; filename="bid_templates.zip"')
+        self.end_headers()
+        out = _Chunked(self.wfile)
+        bundle, sent = ZipBundle(out, level=self.server.zip_level), set()
+
+        def on_update(items):                       # cada resultado sale en cuanto termina
+            for i, it in enumerate(items):
+                if it.result is not None and i not in sent:
+                    bundle.add(output_name(it.name, it.result[0]), it.result[1])
+                    out.flush()
+                    sent.add(i)
+                    it.result = None
+
+        items = run_batch(files, workers=self.server.workers, executor=self.server.pool,
+                          cache=self.server.cache, options=options, on_update=on_update)
+        errors = {it.name: it.error for it in items if it.status == FAILED}
+        if errors:                                  # ya se enviaron las cabeceras: van en el ZIP
+            bundle.add("errores.json", json.dumps(errors, ensure_ascii=False, indent=2).encode())
+        bundle.close()
+        out.close()
+
+    def _json(self, status: HTTPStatus, payload: dict, headers: dict | None = None) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _reject(self, status: HTTPStatus, payload: dict, headers: dict | None = None) -> None:
+        """Error sin haber leído (todo) el cuerpo: responde y cierra la conexión."""
+        self.close_connection = True
+        self._json(status, payload, {**(headers or {}), "Connection": "close"})
+
+    def _authorized(self) -> bool:
+        token = self.server.token
+        if not token:
+            return True
+        sent = self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        return hmac.compare_digest(sent.encode(), token.encode())
+
+    def log_message(self, fmt, *args):
+        if not self.server.quiet:
+            super().log_message(fmt, *args)
+
+
+class TemplateServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer con el pool de procesos, la caché y los límites."""
+    daemon_threads = True
+
+    def __init__(self, address, *, workers: int, concurrency: int, max_bytes: int,
+                 token: str | None = None, zip_level: int = 0, quiet: bool = False):
+        super().__init__(address, Handler)
+        self.pool, self.workers = make_pool(workers), workers
+        self.cache = ResultCache()
+        self.version = code_version()
+        self.capacity, self.max_bytes = concurrency, max_bytes
+        self.token, self.zip_level, self.quiet = token, zip_level, quiet
+        self.busy = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Reserva un hueco de proceso; False si ya hay `capacity` peticiones en curso."""
+        with self._lock:
+            if self.busy >= self.capacity:
+                return False
+            self.busy += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.busy -= 1
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(cancel_futures=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    env = os.environ.get
+    ap = argparse.ArgumentParser(prog="api.py", description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("--host", default=env("BID_API_HOST", "127.0.0.1"))
+    ap.add_argument("--port", type=int, default=int(env("BID_API_PORT", 8000)))
+    ap.add_argument("-j", "--workers", type=int, default=default_workers(),
+                    help="procesos que generan plantillas (por defecto %(default)s)")
+    ap.add_argument("--concurrency", type=int, default=int(env("BID_API_CONCURRENCY", 4)),
+                    help="peticiones procesándose a la vez; el resto recibe 503")
+    ap.add_argument("--max-mb", type=float, default=float(env("BID_API_MAX_MB", 50)),
+                    help="tamaño máximo del cuerpo de una petición")
+    ap.add_argument("--warmup", action="store_true", default=env("BID_WARMUP", "0") == "1",
+                    help="arrancar y calentar los procesos antes de la primera petición")
+    ap.add_argument("-q", "--quiet", action="store_true", help="sin registro de peticiones")
+    args = ap.parse_args(argv)
+
+    srv = TemplateServer((args.host, args.port), workers=args.workers,
+                         concurrency=args.concurrency, max_bytes=int(args.max_mb * 2**20),
+                         token=env("BID_API_TOKEN"), zip_level=int(env("BID_ZIP_LEVEL", 0)),
+                         quiet=args.quiet)
+    if args.warmup:
+        from warmup import warm_pool
+        warm_pool(srv.pool, args.workers)
+    print(f"API en http://{args.host}:{args.port} "
+          f"({args.workers} procesos, {args.concurrency} peticiones a la vez)", file=sys.stderr)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
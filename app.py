@@ -1,6 +1,22 @@
 import streamlit as st
-import hashlib, time, io, zipfile
-from pipeline import run_pipeline   # ← tu función existente
+import hashlib, json, os, time, uuid
+
+# Nivel DEFLATE del ZIP (0 = sin compresión). Los .xlsx se guardan siempre
+# sin recomprimir: ya vienen comprimidos.
+ZIP_LEVEL = int(os.environ.get("BID_ZIP_LEVEL", 6))
+# BID_WARMUP=1: calentar pandas/openpyxl y el pool mientras se muestra el login
+WARMUP = os.environ.get("BID_WARMUP", "0") == "1"
+
+# ╔══════════════════════ 0. CALENTAMIENTO ═════════════════════╗
+@st.cache_resource
+def calentar() -> None:
+    """Una vez por proceso, en segundo plano: no retrasa la página de login."""
+    from warmup import warm_in_background
+    warm_in_background()
+
+if WARMUP:
+    calentar()
+# ╚═════════════════════════════════════════════════════════════╝
 
 # ╔══════════════════════════ 1. LOGIN ═════════════════════════╗
 def login() -> bool:
@@ -17,6 +33,7 @@ def login() -> bool:
         creds = st.secrets["credentials"]
         if user in creds and hashlib.sha256(pwd.encode()).hexdigest() == creds[user]:
             st.session_state["auth_ok"] = True
+            st.session_state["user"] = user     # dueño de sus trabajos (ver jobs.py)
             return True
         st.error("Credenciales incorrectas")
         time.sleep(1)
@@ -25,6 +42,16 @@ def login() -> bool:
 # Ejecutar control de acceso
 if not login():
     st.stop()
+
+# módulos pesados solo tras el login (la página de acceso carga al instante)
+from pipeline import TEMPLATE_KEYS
+from templates import render_plan
+from cache import ResultCache
+from batch import default_workers, make_pool, FAILED
+from jobs import JobManager
+from admission import AdmissionController
+from store import sweep_stale
+from validation import Problem
 # ╚═════════════════════════════════════════════════════════════╝
 
 
@@ -44,55 +71,220 @@ with st.expander("ℹ️ Cómo usar esta herramienta", expanded=True):
 # ╚═════════════════════════════════════════════════════════════╝
 
 
+# ╔══════════════════════ 2b. CACHÉ DE RESULTADOS ══════════════╗
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """Una caché por proceso, compartida entre sesiones.
+
+    Variables de entorno (opcionales):
+      BID_CACHE_DIR       carpeta del nivel en disco (sin ella solo memoria)
+      BID_CACHE_DISK_MB   tamaño máximo en disco   (por defecto 1024)
+      BID_CACHE_TTL_H     horas de vida en disco   (por defecto 24)
+    """
+    return ResultCache(
+        max_items=32,
+        disk_dir=os.environ.get("BID_CACHE_DIR"),
+        disk_max_bytes=int(os.environ.get("BID_CACHE_DISK_MB", 1024)) * 2**20,
+        ttl=float(os.environ.get("BID_CACHE_TTL_H", 24)) * 3600,
+    )
+
+@st.cache_resource
+def get_pool(workers: int):
+    """Pool de procesos persistente (uno por nº de workers)."""
+    pool = make_pool(workers)
+    if WARMUP:                         # arranca y calienta todos los procesos ya
+        from warmup import warm_pool
+        warm_pool(pool, workers)
+    return pool
+
+cache = get_result_cache()
+# ╚═════════════════════════════════════════════════════════════╝
+
+
+# ╔══════════════════════ 2c. COLA DE TRABAJOS ═════════════════╗
+@st.cache_resource
+def get_jobs() -> JobManager:
+    """Gestor de trabajos del proceso: los lotes siguen aunque la página se recargue.
+
+    Variables de entorno (opcionales):
+      BID_MAX_PIPELINES     archivos procesándose a la vez en el contenedor (por defecto nº de CPU)
+      BID_MEM_BUDGET_MB     memoria estimada para esos archivos (por defecto 1024)
+      BID_MAX_JOBS          lotes activos a la vez; sus archivos comparten la cola de
+                            admisión (por defecto 8)
+      BID_JOB_MB            espacio en disco por lote    (por defecto 512)
+      BID_SESSION_MB        espacio en disco de todos los lotes de un usuario (por defecto 512)
+      BID_JOB_RETENTION_H   horas que se guardan los lotes terminados (por defecto 1)
+    """
+    sweep_stale(24 * 3600)             # carpetas huérfanas de ejecuciones anteriores
+    admission = AdmissionController(
+        max_running=int(os.environ.get("BID_MAX_PIPELINES", os.cpu_count() or 1)),
+        memory_budget=int(os.environ.get("BID_MEM_BUDGET_MB", 1024)) * 2**20,
+    )
+    return JobManager(
+        max_running=int(os.environ.get("BID_MAX_JOBS", 8)),
+        retention=float(os.environ.get("BID_JOB_RETENTION_H", 1)) * 3600,
+        store_bytes=int(os.environ.get("BID_JOB_MB", 512)) * 2**20,
+        owner_bytes=int(os.environ.get("BID_SESSION_MB", 512)) * 2**20,
+        cache=cache, zip_level=ZIP_LEVEL, admission=admission,
+    )
+
+jobs = get_jobs()
+# los trabajos son del usuario (no de la pestaña): sobreviven a reconexiones
+owner = st.session_state.setdefault("user", uuid.uuid4().hex)
+# ╚═════════════════════════════════════════════════════════════╝
+
+
 # ╔══════════════════════ 3. UPLOAD & PROCESO ══════════════════╗
 uploaded_files = st.file_uploader(
     "📂 Arrastra aquí tus archivos .xlsx",
     type=["xlsx"], accept_multiple_files=True, key="uploader"
 )
 
+workers = int(st.number_input("⚙️ Procesos en paralelo", min_value=1,
+                              max_value=os.cpu_count() or 1, value=default_workers(),
+                              help="Archivos que se procesan a la vez."))
+diagnostico = st.toggle("🩺 Diagnóstico por etapas",
+                        help="Tiempos de lectura, de cada hoja y de guardado, filas y celdas.")
+
+plantillas = st.multiselect("🧩 Plantillas a generar", TEMPLATE_KEYS, default=list(TEMPLATE_KEYS),
+                            format_func=lambda k: render_plan(k).title,
+                            help="Las plantillas no elegidas no se construyen (ni se leen sus datos).")
+compresion = st.select_slider("🗜️ Compresión de los .xlsx", ["fast", "balanced", "smallest"],
+                              value="balanced",
+                              format_func={"fast": "rápida", "balanced": "equilibrada",
+                                           "smallest": "máxima"}.get,
+                              help="Rápida: genera antes, archivos algo mayores. Máxima: "
+                                   "archivos más pequeños, tarda más.")
+cartera = st.checkbox("📚 Un solo libro de cartera",
+                      help="Todos los proyectos en un .xlsx: un grupo de hojas por proyecto "
+                           "(P01, P02, …) y una hoja Índice con enlaces.")
+por_plantilla = st.checkbox("🗂️ Un archivo por plantilla", disabled=cartera,
+                            help="Cada plantilla en su propio .xlsx, juntos en un ZIP por proyecto.")
+
 if st.button("🚀 Procesar") and uploaded_files:
-    resultados = []
-    for f in uploaded_files:
-        with st.spinner(f"Procesando **{f.name}** …"):
-            nombre, contenido = run_pipeline(f.read())
-            nombre_final = f"{f.name.rsplit('.',1)[0]}_{nombre}"
-            resultados.append((nombre_final, contenido))
-    st.session_state["resultados"] = resultados
+    if not plantillas:
+        st.warning("Elige al menos una plantilla.")
+        st.stop()
+    opciones = {}
+    if len(plantillas) < len(TEMPLATE_KEYS):
+        opciones["templates"] = tuple(plantillas)
+    if por_plantilla and not cartera:
+        opciones["split"] = True
+    if compresion != "balanced":
+        opciones["compression"] = compresion
+    job_id = jobs.submit(
+        [(f.name, f) for f in uploaded_files], owner=owner,       # se vuelcan a disco
+        workers=workers,
+        executor=get_pool(workers) if workers > 1 else None,    # 1 archivo grande: reparte sus hojas
+        metrics=diagnostico, options=opciones, portfolio=cartera,
+    )
+    st.toast(f"Lote #{job_id} en cola: puedes seguir trabajando o encolar otro.")
+
+st.caption(f"🗃️ Caché: {cache.stats.hits} aciertos "
+           f"({cache.stats.disk_hits} desde disco) · {cache.stats.misses} fallos")
 # ╚═════════════════════════════════════════════════════════════╝
 
 
-# ╔══════════════════════ 4. DESCARGAS UI ══════════════════════╗
-if "resultados" in st.session_state:
-    st.subheader("⬇️ Descargas")
-
-    # Botón ZIP si hay más de un archivo
-    if len(st.session_state["resultados"]) > 1:
-        buffer = io.BytesIO()
-        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-            for fname, fbytes in st.session_state["resultados"]:
-                zf.writestr(fname, fbytes)
-        buffer.seek(0)
-        st.download_button(
-            "📦 Descargar TODO (.zip)",
-            data=buffer,
-            file_name="bid_templates.zip",
-            mime="application/zip"
-        )
+# ╔══════════════════════ 4. TRABAJOS Y DESCARGAS ══════════════╗
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+def diagnostico_ui(job) -> None:
+    """Métricas por etapa de cada archivo del lote (si se pidieron)."""
+    metricas = [{"archivo": it.name, "estado": it.status, "segundos": it.seconds,
+                 **(it.metrics or {})} for it in job.items]
+    if not any(it.metrics for it in job.items):
+        return
+    with st.expander("🩺 Diagnóstico"):
+        for m in metricas:
+            st.markdown(f"**{m['archivo']}** · {m['estado']}")
+            if "stages" not in m:
+                st.caption("Sin métricas: resultado servido desde la caché o con error.")
+                continue
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Entrada", f"{m['input_bytes'] / 1024:.0f} KB")
+            c2.metric("Salida", f"{m['output_bytes'] / 1024:.0f} KB")
+            c3.metric("Celdas", m["cells"])
+            c4.metric("Total", f"{m['total_seconds'] * 1e3:.0f} ms")
+            st.dataframe([{"Etapa": s["name"],
+                           "Tiempo (ms)": round(s["seconds"] * 1e3, 1),
+                           "%": round(100 * s["seconds"] / (m["total_seconds"] or 1), 1),
+                           "Celdas": s["cells"]} for s in m["stages"]], hide_index=True)
+            st.caption(" · ".join(f"{hoja}: {n} filas" for hoja, n in m["rows"].items()))
+            if m.get("reused"):
+                st.caption(f"♻️ Hojas reutilizadas del resultado anterior: {', '.join(m['reused'])}")
+        st.download_button("📊 Métricas del lote (.json)",
+                           data=json.dumps(metricas, ensure_ascii=False, indent=2),
+                           file_name=f"bid_metricas_{job.id}.json", mime="application/json",
+                           key=f"met-{job.id}")
 
+def trabajo_ui(job) -> None:
+    segs = f" · {job.seconds:.1f}s" if job.seconds is not None else ""
+    st.markdown(f"**Lote #{job.id}** · {job.status} · {len(job.items)} archivo(s){segs}")
+    if job.active:
+        st.progress(job.progress)
+        puesto = jobs.queue_position(owner)
+        if puesto is not None:
+            carga = jobs.admission.stats()
+            st.caption(f"⏳ Esperando turno: puesto {puesto} en la cola · "
+                       f"{carga['running']}/{carga['max_running']} archivos en proceso")
+        st.dataframe([it.as_row() for it in job.items], hide_index=True)
+        if st.button("✖️ Cancelar", key=f"cancel-{job.id}"):
+            jobs.cancel(job.id)
+        return
+
+    st.dataframe([it.as_row() for it in job.items], hide_index=True)
+    repetidos = [it for it in job.items if it.duplicate_of]
+    if repetidos:
+        st.info("♊ Archivos con el mismo contenido, procesados una sola vez: "
+                + " · ".join(f"**{it.name}** = {it.duplicate_of}" for it in repetidos))
+    if job.error:
+        st.error(job.error)
+    for it in job.items:
+        if it.status == FAILED and it.problems:   # rechazado por la validación previa
+            st.error(f"**{it.name}** no tiene la estructura esperada:\n"
+                     + "\n".join(f"- {Problem(**p)}" for p in it.problems))
+        elif it.status == FAILED:
+            st.error(f"**{it.name}**: {it.error}")
+        elif it.warnings:
+            st.warning(f"**{it.name}** — revise la numeración:\n"
+                       + "\n".join(f"- {Problem(**p)}" for p in it.warnings))
+    for aviso in job.warnings:
+        st.warning(f"⚠️ {aviso}")
+
+    if job.portfolio:
+        st.download_button("📚 Descargar cartera (.xlsx)", data=job.store.reader(job.portfolio),
+                           file_name=job.portfolio, mime=XLSX_MIME, key=f"cartera-{job.id}")
+    # Botón ZIP si hay más de un archivo (construido una sola vez por lote)
+    if job.zip:
+        st.download_button("📦 Descargar TODO (.zip)",
+                           data=job.store.reader(job.zip),   # se lee del disco al pulsar
+                           file_name=job.zip, mime="application/zip", key=f"zip-{job.id}")
     # Botones individuales
-    for fname, fbytes in st.session_state["resultados"]:
-        st.download_button(
-            f"💾 {fname}",
-            data=fbytes,
-            file_name=fname,
-            mime=("application/vnd.openxmlformats-officedocument."
-                  "spreadsheetml.sheet")
-        )
+    for fname in job.results:
+        st.download_button(f"💾 {fname}", data=job.store.reader(fname), file_name=fname,
+                           mime="application/zip" if fname.endswith(".zip") else XLSX_MIME,
+                           key=f"dl-{job.id}-{fname}")
+    diagnostico_ui(job)
 
-    st.divider()
+def panel_trabajos(sondeando: bool) -> None:
+    mis_trabajos = jobs.jobs(owner)
+    if not mis_trabajos:
+        return
+    st.subheader("⬇️ Trabajos y descargas")
+    for job in mis_trabajos:
+        with st.container(border=True):
+            trabajo_ui(job)
+    if sondeando and not any(j.active for j in mis_trabajos):
+        st.rerun()                     # todo terminó: un rerun completo detiene el sondeo
+
+activos = any(j.active for j in jobs.jobs(owner))
+# mientras haya lotes en marcha el panel se refresca solo, sin bloquear la página
+st.fragment(panel_trabajos, run_every=1.0 if activos else None)(activos)
 
+if jobs.jobs(owner) and not activos:
+    st.divider()
     # Reiniciar resultados (no cierra sesión)
     if st.button("🔄 Reiniciar proceso"):
-        st.session_state.pop("resultados", None)  # elimina solo los outputs
-        st.rerun()  
-
+        jobs.forget(owner)             # borra los lotes terminados y sus archivos
+        st.rerun()
+# ╚═════════════════════════════════════════════════════════════╝
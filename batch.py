@@ -0,0 +1,276 @@
+# batch.py
+"""
+Procesamiento por lotes: reparte los archivos entre un pool de procesos
+(cada `run_pipeline` es independiente y CPU-bound) y devuelve los
+resultados en el orden de entrada aunque terminen desordenados.
+
+Los archivos con el mismo contenido (el mismo libro subido dos veces o
+con otro nombre) se procesan una sola vez; las copias reciben el mismo
+resultado y llevan en `duplicate_of` el nombre del archivo procesado.
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+import os, threading, time
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable
+
+from admission import estimate_cost
+from cache import content_key
+from pipeline import input_size, run_pipeline
+from validation import validate as validate_file
+
+# estados de cada archivo
+PENDING, RUNNING = "⏳ en cola", "⚙️ procesando"
+CACHED, DONE, FAILED = "🗃️ caché", "✅ listo", "❌ error"
+CANCELLED = "🚫 cancelado"
+
+# un lote de un solo archivo a partir de este tamaño reparte sus hojas entre
+# los procesos (run_pipeline con sheet_workers) en lugar de usar uno solo
+PARALLEL_SHEETS_MIN = int(os.environ.get("BID_PARALLEL_SHEETS_KB", 256)) * 1024
+
+
+@dataclass
+class BatchItem:
+    name: str                                   # nombre del archivo subido
+    size: int                                   # bytes de entrada
+    status: str = PENDING
+    seconds: float | None = None
+    result: tuple[str, bytes] | None = None     # (nombre_resultado, contenido) o lo que devuelva `task`
+    error: str | None = None
+    metrics: dict | None = None                 # PipelineMetrics.as_dict() (si se piden)
+    problems: list[dict] | None = None          # validación previa fallida (validation.Problem)
+    warnings: list[dict] | None = None          # avisos de la validación previa (no impiden procesar)
+    duplicate_of: str | None = None             # archivo idéntico del lote del que copia el resultado
+
+    def as_row(self) -> dict:
+        return {"Archivo": self.name,
+                "Tamaño (KB)": round(self.size / 1024, 1),
+                "Estado": self.status,
+                "Tiempo (s)": None if self.seconds is None else round(self.seconds, 2),
+                "Detalle": self.error or (f"idéntico a {self.duplicate_of}"
+                                          if self.duplicate_of else "")}
+
+
+def default_workers() -> int:
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def make_pool(workers: int) -> ProcessPoolExecutor:
+    """Pool con 'spawn': seguro dentro de servidores con hilos (Streamlit)."""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+
+
+def _timed_run(content, metrics: bool = False, previous=None,
+               options: dict | None = None) -> tuple[tuple[str, bytes], float, dict | None]:
+    collected = []
+    t0 = time.perf_counter()
+    result = run_pipeline(content, previous=previous, **(options or {}),
+                          on_metrics=collected.append if metrics else None)
+    return result, time.perf_counter() - t0, collected[0].as_dict() if collected else None
+
+
+def run_batch(files: list[tuple[str, bytes]], *,
+              workers: int | None = None,
+              executor: Executor | None = None,
+              cache=None,
+              metrics: bool = False,
+              options: dict | None = None,
+              validate: bool = True,
+              previous: dict | None = None,
+              cancel: threading.Event | None = None,
+              task: Callable | None = None,
+              admission=None, owner: str = "",
+              on_update: Callable[[list[BatchItem]], None] | None = None) -> list[BatchItem]:
+    """
+    Procesa [(nombre, contenido), …] y devuelve un BatchItem por archivo,
+    en el mismo orden. El contenido puede ser bytes o la ruta del .xlsx en
+    disco; con rutas, al pool solo viaja la ruta y cada proceso lee el
+    archivo directamente (sin copias de la entrada en memoria).
+
+    Parameters
+    ----------
+    workers : int, optional
+        Procesos en paralelo (por defecto `default_workers()`); con 1 se
+        procesa en el propio proceso, sin pool. Si queda un solo archivo
+        grande (≥ PARALLEL_SHEETS_MIN), se procesa aquí y sus plantillas se
+        renderizan a la vez en los procesos.
+    executor : Executor, optional
+        Pool ya creado (p. ej. uno persistente de la app); `workers` debe
+        ser entonces su número de procesos (cuántos archivos van a la vez).
+    cache : ResultCache, optional
+        Se consulta antes de enviar cada archivo y se llena al terminar.
+    metrics : bool
+        Guarda en `BatchItem.metrics` las métricas por etapa de cada archivo
+        procesado (los aciertos de caché no las tienen).
+    options : dict, optional
+        Argumentos extra de `run_pipeline` (`templates`, `split`); forman
+        parte de la clave de caché.
+    validate : bool
+        Revisa cada archivo (hojas, encabezados, objetivos sin
+        indicadores) antes de enviarlo; los que no pasan quedan FAILED con
+        `problems` sin ocupar un proceso (ver validation.py).
+    previous : dict, optional
+        {nombre: resultado anterior (bytes o ruta)}: solo se reconstruyen las
+        hojas cuyos datos cambiaron (ver incremental.py).
+    cancel : threading.Event, optional
+        Al activarse, los archivos que aún no empezaron quedan CANCELLED
+        (los que ya están en marcha terminan).
+    task : callable, optional
+        Función de nivel de módulo con la firma de `_timed_run` que sustituye
+        a run_pipeline (p. ej. portfolio.timed_load); sin caché.
+    admission : AdmissionController, optional
+        Control de admisión global: cada archivo espera su turno (a nombre
+        de `owner`) antes de ejecutarse; los que esperan siguen PENDING.
+    on_update : callable, optional
+        Se llama con la lista completa cada vez que cambia un estado.
+    """
+    items = [BatchItem(name, input_size(content)) for name, content in files]
+    copies: dict[int, int] = {}                 # copia → índice del archivo que se procesa
+
+    def fan_out() -> None:
+        """Las copias siguen el estado de su original hasta que este termina."""
+        for i, j in copies.items():
+            copy, src = items[i], items[j]
+            if copy.status in (PENDING, RUNNING):
+                copy.status, copy.result = src.status, src.result
+                copy.error, copy.problems, copy.warnings = src.error, src.problems, src.warnings
+                if copy.status not in (PENDING, RUNNING):
+                    copy.seconds = 0.0
+
+    def notify() -> None:
+        fan_out()
+        if on_update:
+            on_update(items)
+
+    if task is not None:
+        cache = None                    # la caché solo guarda resultados de run_pipeline
+    task = task or _timed_run
+    variant = repr(sorted(options.items())) if options else ""
+    todo, keys, first = [], {}, {}
+    for i, (_, content) in enumerate(files):
+        # huella del contenido, una vez por archivo (con rutas, lee el archivo)
+        keys[i] = cache.key(content, variant) if cache is not None else content_key(content, "")
+        if keys[i] in first:            # mismo contenido que un archivo anterior del lote
+            copies[i] = first[keys[i]]
+            items[i].duplicate_of = items[copies[i]].name
+            continue
+        first[keys[i]] = i
+        hit = cache.get(keys[i]) if cache is not None else None
+        if hit is not None:
+            items[i].status, items[i].result, items[i].seconds = CACHED, hit, 0.0
+            continue
+        if validate:
+            report = validate_file(content, (options or {}).get("templates"))
+            if not report.ok:
+                items[i].status, items[i].seconds = FAILED, report.seconds
+                items[i].error = report.summary()
+                items[i].problems = report.as_dict()["problems"]
+                continue
+            items[i].warnings = report.as_dict()["warnings"] or None
+        todo.append(i)
+    notify()
+
+    def finish(i: int, run: Callable[[], tuple[tuple[str, bytes], float, dict | None]]) -> None:
+        try:
+            items[i].result, items[i].seconds, items[i].metrics = run()
+            items[i].status = DONE
+            if cache is not None:
+                cache.put(keys[i], items[i].result)
+        except Exception as exc:                # un archivo malo no tumba el lote
+            items[i].status, items[i].error = FAILED, f"{type(exc).__name__}: {exc}"
+        notify()
+
+    previous = previous or {}
+    cancelled = cancel.is_set if cancel is not None else (lambda: False)
+    workers = workers or default_workers()
+    if (len(todo) == 1 and task is _timed_run and workers > 1
+            and items[todo[0]].size >= PARALLEL_SHEETS_MIN):
+        # la variante de caché ya está calculada: estas opciones no cambian el resultado
+        options = {**(options or {}), "sheet_workers": workers, "executor": executor}
+        executor, workers = None, 1
+
+    # turnos del control de admisión (uno por archivo, se liberan al terminar)
+    tickets = {}
+
+    def request(i: int) -> None:
+        if admission is not None:
+            tickets[i] = admission.request(owner, estimate_cost(items[i].size))
+
+    def admitted(i: int) -> bool:
+        return i not in tickets or tickets[i].admitted
+
+    def release(i: int) -> None:
+        if i in tickets:
+            admission.release(tickets.pop(i))
+
+    if executor is None and (workers == 1 or len(todo) <= 1):
+        for i in todo:
+            request(i)                      # de uno en uno: no retener turnos sin usar
+            while not admitted(i) and not cancelled():
+                tickets[i].wait(0.25)
+            if cancelled():
+                release(i)
+                items[i].status = CANCELLED
+                notify()
+                continue
+            items[i].status = RUNNING
+            notify()
+            try:
+                finish(i, lambda: task(files[i][1], metrics, previous.get(files[i][0]), options))
+            finally:
+                release(i)
+        fan_out()
+        return items
+
+    pool = executor or make_pool(workers)
+    # no más archivos en vuelo (enviados o con turno pedido) que procesos en el
+    # pool: los turnos se piden a medida que se liberan huecos, como en serie
+    slots = max(1, workers)
+    try:
+        waiting, futures, pending = list(todo), {}, set()
+        while waiting or pending:
+            ready = waiting[:slots - len(pending)]
+            for i in ready:
+                if i not in tickets:
+                    request(i)
+            for i in [i for i in ready if admitted(i)]:
+                waiting.remove(i)
+                fut = pool.submit(task, files[i][1], metrics, previous.get(files[i][0]), options)
+                futures[fut] = i
+                pending.add(fut)
+            if pending:
+                done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+            else:                           # todo en la cola de admisión
+                tickets[waiting[0]].wait(0.25)
+                done = set()
+            for fut in done:
+                release(futures[fut])
+                if fut.cancelled():
+                    items[futures[fut]].status = CANCELLED
+                    notify()
+                else:
+                    finish(futures[fut], fut.result)
+            if cancelled():
+                for fut in pending:
+                    fut.cancel()            # solo afecta a los que no empezaron
+                for i in waiting:
+                    release(i)
+                    items[i].status = CANCELLED
+                if waiting:
+                    waiting.clear()
+                    notify()
+            started = [futures[f] for f in pending
+                       if f.running() and items[futures[f]].status == PENDING]
+            for i in started:
+                items[i].status = RUNNING
+            if started:
+                notify()
+    finally:
+        for i in list(tickets):             # p. ej. el pool se rompió
+            release(i)
+        if executor is None:
+            pool.shutdown()
+    fan_out()
+    return items
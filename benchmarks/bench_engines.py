@@ -0,0 +1,126 @@
+# benchmarks/bench_engines.py
+"""
+Motores de salida: builders de openpyxl frente al XML directo de sheetml.
+
+    python -m benchmarks.bench_engines                   # small/medium/large
+    python -m benchmarks.bench_engines --sizes large -n 5
+    python -m benchmarks.bench_engines --indicators 40 --solutions 400   # marco a medida
+
+Para cada tamaño mide `run_pipeline(data, engine=…)` (mediana de tiempos
+y pico de tracemalloc) y comprueba que ambos libros son equivalentes:
+se abren con openpyxl y se comparan, hoja a hoja, los valores y el
+estilo de cada celda, las celdas combinadas, los anchos, los altos de
+fila y las listas desplegables. También con `split=True`. Sale con 1 si
+algo difiere, así que sirve de prueba tras tocar tables.py o sheetml.py.
+"""
+from __future__ import annotations
+
+import argparse, io, statistics, sys, time, tracemalloc, zipfile
+
+
+def _sheets(xlsx: bytes) -> dict[str, dict]:
+    """Todo lo que se ve de cada hoja, en estructuras comparables."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(io.BytesIO(xlsx))
+    styles = wb._cell_styles
+    out = {}
+    for ws in wb.worksheets:
+        out[ws.title] = {
+            "cells": {(c.row, c.column): (c.value, styles.add(c._style))
+                      for row in ws.iter_rows() for c in row
+                      if c.value is not None or c.has_style},
+            "merges": {str(r) for r in ws.merged_cells.ranges},
+            "widths": {k: d.width for k, d in ws.column_dimensions.items() if d.customWidth},
+            "heights": {k: d.height for k, d in ws.row_dimensions.items() if d.height},
+            "validations": sorted((dv.type, dv.formula1, tuple(sorted(str(dv.sqref).split())))
+                                  for dv in ws.data_validations.dataValidation),
+        }
+    return out
+
+
+def differences(a: bytes, b: bytes) -> list[str]:
+    """Diferencias visibles entre dos .xlsx (vacía si son equivalentes)."""
+    sa, sb = _sheets(a), _sheets(b)
+    if list(sa) != list(sb):
+        return [f"hojas: {list(sa)} ≠ {list(sb)}"]
+    found = []
+    for title in sa:
+        for part in sa[title]:
+            x, y = sa[title][part], sb[title][part]
+            if x == y:
+                continue
+            if isinstance(x, dict):
+                keys = sorted(set(x) ^ set(y) | {k for k in x.keys() & y.keys() if x[k] != y[k]})
+                found.append(f"{title} · {part}: {len(keys)} distintas, p. ej. "
+                             + ", ".join(f"{k}: {x.get(k)!r} ≠ {y.get(k)!r}" for k in keys[:3]))
+            else:
+                found.append(f"{title} · {part}: {x!r} ≠ {y!r}")
+    return found
+
+
+def _split_differences(a: bytes, b: bytes) -> list[str]:
+    """Como `differences`, miembro a miembro de los ZIP de split=True."""
+    za, zb = zipfile.ZipFile(io.BytesIO(a)), zipfile.ZipFile(io.BytesIO(b))
+    if za.namelist() != zb.namelist():
+        return [f"split: {za.namelist()} ≠ {zb.namelist()}"]
+    return [f"{n} · {d}" for n in za.namelist() for d in differences(za.read(n), zb.read(n))]
+
+
+def _measure(fn, repeat: int) -> tuple[float, float, bytes]:
+    """Mediana de segundos, pico de memoria (KB) y el último resultado."""
+    times, out = [], b""
+    for _ in range(repeat + 1):                         # la 1.ª es calentamiento
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(times[1:]), peak / 1024, out
+
+
+def main(argv: list[str] | None = None) -> int:
+    from pipeline import run_pipeline
+    from synthetic import SIZES, make_workbook
+
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("--sizes", nargs="+", default=["small", "medium", "large"], choices=list(SIZES))
+    ap.add_argument("-n", "--repeat", type=int, default=3, help="repeticiones por motor")
+    ap.add_argument("--indicators", type=int, help="indicadores por objetivo (marco a medida)")
+    ap.add_argument("--solutions", type=int, help="componentes Solution (marco a medida)")
+    args = ap.parse_args(argv)
+
+    cases = {}
+    for size in args.sizes:
+        params = dict(SIZES[size])
+        if args.indicators is not None:
+            params["indicators_per_objective"] = args.indicators
+        if args.solutions is not None:
+            params["n_solutions"] = args.solutions
+        cases[size] = make_workbook(**params)
+
+    print(f"{'tamaño':<10}{'motor':<10}{'ms':>10}{'pico KB':>10}{'aceleración':>13}")
+    failed = False
+    for size, data in cases.items():
+        ref = None
+        for engine in ("openpyxl", "sheetml"):
+            secs, peak, out = _measure(lambda: run_pipeline(data, engine=engine)[1], args.repeat)
+            speed = "" if ref is None else f"{ref[0] / secs:>12.2f}×"
+            print(f"{size:<10}{engine:<10}{secs * 1e3:>10.0f}{peak:>10.0f}{speed:>13}")
+            if ref is None:
+                ref = (secs, out)
+        diffs = differences(ref[1], out)
+        diffs += _split_differences(run_pipeline(data, split=True)[1],
+                                    run_pipeline(data, split=True, engine="sheetml")[1])
+        for d in diffs:
+            print(f"  ⚠️  {d}")
+        failed |= bool(diffs)
+    print("\n" + ("⚠️  Los motores generan libros distintos." if failed
+                  else "Libros equivalentes en todos los tamaños."))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# benchmarks/bench_ingest.py
+"""
+Memoria al ingerir una subida: bytes en memoria frente a volcado a disco.
+
+    python -m benchmarks.bench_ingest                    # tamaño large, 4 subidas
+    python -m benchmarks.bench_ingest --extra-rows 60000 --copies 2   # entrada de ~2 MB
+
+Simula lo que hace un lote con cada archivo subido, partiendo del
+UploadedFile que Streamlit ya tiene en memoria (un BytesIO):
+  • bytes : `getvalue()` de todas las subidas al encolar, clave de caché,
+            validación, envío al pool (pickle ida y vuelta) y lectura
+  • ruta  : `ResultStore.spool` a disco y las mismas etapas con la ruta
+            (al pool solo viaja la ruta; los lectores abren el archivo)
+Se mide aparte la ingesta (hasta `read_inputs`, lo que cambia) y el
+pipeline completo. Cada variante corre en un proceso nuevo, ya calentado
+con un libro pequeño; se informa el pico de tracemalloc (memoria de
+Python) y el aumento del pico de RSS del proceso (incluye lo que reservan
+calamine y zlib fuera de Python). Los resultados de ambas variantes se
+comparan hoja a hoja.
+"""
+from __future__ import annotations
+
+import argparse, io, multiprocessing as mp, pickle, sys, tempfile, time, tracemalloc, zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+def _peak_rss_kb() -> int | None:
+    try:
+        import resource
+    except ImportError:                                 # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def _sheets(data: bytes) -> dict[str, bytes]:
+    """Partes XML de las hojas (lo que no depende de la hora del guardado)."""
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        return {n: zf.read(n) for n in zf.namelist() if n.startswith("xl/worksheets/")}
+
+
+def run_case(mode: str, source: str, copies: int) -> dict:
+    """Una variante completa en su propio proceso."""
+    from cache import ResultCache
+    from pipeline import read_inputs, run_pipeline
+    from store import ResultStore
+    from synthetic import SIZES, make_workbook
+    from validation import validate
+
+    run_pipeline(make_workbook(**SIZES["tiny"]))        # importaciones y cachés fuera de la medida
+    uploads = [io.BytesIO(Path(source).read_bytes()) for _ in range(copies)]
+    cache, store = ResultCache(), ResultStore()
+    rss0 = _peak_rss_kb()
+
+    # ingesta: del UploadedFile a los DataFrames (los marcos se sueltan al leerlos)
+    t0 = time.perf_counter()
+    tracemalloc.start()
+    if mode == "bytes":
+        queued = [u.getvalue() for u in uploads]
+    else:
+        queued = [store.spool(f"p{i}.xlsx", u) for i, u in enumerate(uploads)]
+    for content in queued:
+        cache.key(content)
+        validate(content)
+        read_inputs(pickle.loads(pickle.dumps(content)))    # lo que hace el pool con los argumentos
+    ingest_peak = tracemalloc.get_traced_memory()[1]
+    ingest_secs = time.perf_counter() - t0
+    rss1 = _peak_rss_kb()
+
+    # pipeline completo sobre la primera entrada (con las demás aún en cola)
+    tracemalloc.reset_peak()
+    result = run_pipeline(pickle.loads(pickle.dumps(queued[0])))[1]
+    total_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    store.close()
+
+    return {"ingest_seconds": ingest_secs, "ingest_peak_kb": ingest_peak / 1024,
+            "total_peak_kb": total_peak / 1024,
+            "rss_delta_kb": None if rss0 is None else rss1 - rss0,
+            "sheets": _sheets(result)}
+
+
+def main(argv: list[str] | None = None) -> int:
+    from synthetic import SIZES, make_workbook
+
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("--size", default="large", choices=list(SIZES))
+    ap.add_argument("--copies", type=int, default=4, help="subidas encoladas a la vez")
+    ap.add_argument("--extra-rows", type=int, help="filas de relleno (agranda la entrada)")
+    args = ap.parse_args(argv)
+
+    params = dict(SIZES[args.size])
+    if args.extra_rows is not None:
+        params["extra_rows"] = args.extra_rows
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / f"{args.size}.xlsx"
+        source.write_bytes(make_workbook(**params))
+        size_kb = source.stat().st_size / 1024
+        results = {}
+        for mode in ("bytes", "ruta"):                  # un proceso limpio por variante
+            with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn")) as pool:
+                results[mode] = pool.submit(run_case, mode, str(source), args.copies).result()
+
+    print(f"{args.size}: entrada {size_kb:.0f} KB × {args.copies}\n")
+    print(f"{'variante':<10}{'ingesta KB':>12}{'Δ RSS KB':>10}{'ingesta ms':>12}"
+          f"{'pipeline KB':>13}")
+    for mode, r in results.items():
+        print(f"{mode:<10}{r['ingest_peak_kb']:>12.0f}{r['rss_delta_kb'] or 0:>10.0f}"
+              f"{r['ingest_seconds'] * 1e3:>12.0f}{r['total_peak_kb']:>13.0f}")
+    if results["bytes"]["sheets"] != results["ruta"]["sheets"]:
+        print("\n⚠️  Las dos variantes generaron hojas distintas.")
+        return 1
+    saved = 1 - results["ruta"]["ingest_peak_kb"] / results["bytes"]["ingest_peak_kb"]
+    print(f"\nPico de la ingesta {saved * 100:.0f}% menor leyendo desde la ruta "
+          f"(pico de Python, tracemalloc).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
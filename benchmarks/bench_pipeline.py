@@ -0,0 +1,177 @@
+# benchmarks/bench_pipeline.py
+"""
+Benchmark por etapas de `run_pipeline` sobre libros sintéticos.
+
+    python -m benchmarks.bench_pipeline                     # compara con baseline.json
+    python -m benchmarks.bench_pipeline --sizes small large -n 5
+    python -m benchmarks.bench_pipeline --update-baseline   # guarda la referencia
+
+Para cada tamaño (ver synthetic.SIZES) mide por separado la lectura, el
+marco de resultados, cada builder de tables.py y el guardado
+(writer.save_workbook, etapa "wb.save"):
+  • tiempo  : mediana de N repeticiones (sin tracemalloc)
+  • memoria : pico de tracemalloc por etapa (una pasada aparte)
+  • RSS     : pico del proceso; cada tamaño corre en un proceso nuevo
+Sale con código 1 si alguna etapa es más lenta que la referencia por
+encima de la tolerancia.
+"""
+from __future__ import annotations
+
+import argparse, io, json, multiprocessing as mp, platform, statistics, sys, time, tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def _stages(data: bytes):
+    """Las etapas de run_pipeline, en orden, como (nombre, función)."""
+    from openpyxl import Workbook
+    from framework import build_framework
+    from pipeline import SHEET_RESULTS, SHEET_SOLUTIONS, read_inputs
+    from writer import save_workbook
+    from tables import (develop_chal_table, create_result_measure_table,
+                        create_summary_next_steps_table, create_theory_of_change_table)
+
+    state = {}
+
+    def read():
+        state["frames"] = read_inputs(data)
+
+    def framework():
+        f = state["frames"]
+        state["fw"] = build_framework(f[SHEET_RESULTS], f[SHEET_SOLUTIONS])
+        state["wb"] = Workbook()
+
+    def builder(fn):
+        return lambda: fn(state["wb"], framework=state["fw"])
+
+    def save():
+        state["out_bytes"] = len(save_workbook(state["wb"]))
+
+    return state, [
+        ("read_inputs", read),
+        ("build_framework", framework),
+        ("C. develop_chal_table", builder(develop_chal_table)),
+        ("E. create_result_measure_table", builder(create_result_measure_table)),
+        ("F. create_summary_next_steps_table", builder(create_summary_next_steps_table)),
+        ("D. create_theory_of_change_table", builder(create_theory_of_change_table)),
+        ("wb.save", save),
+    ]
+
+
+def run_case(size: str, repeat: int) -> dict:
+    """Corre un tamaño completo (en su propio proceso) y devuelve las métricas."""
+    from synthetic import SIZES, make_workbook
+
+    data = make_workbook(**SIZES[size])
+    times: dict[str, list[float]] = {}
+    for _ in range(repeat + 1):                         # la 1.ª es calentamiento
+        _, stages = _stages(data)
+        for name, fn in stages:
+            t0 = time.perf_counter()
+            fn()
+            times.setdefault(name, []).append(time.perf_counter() - t0)
+
+    peaks = {}
+    state, stages = _stages(data)
+    tracemalloc.start()
+    for name, fn in stages:
+        tracemalloc.reset_peak()
+        fn()
+        peaks[name] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    try:
+        import resource
+        rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            rss_kb //= 1024                             # macOS lo da en bytes
+    except ImportError:                                 # Windows
+        rss_kb = None
+
+    return {
+        "input_bytes": len(data),
+        "output_bytes": state["out_bytes"],
+        "peak_rss_kb": rss_kb,
+        "stages": {name: {"seconds": statistics.median(ts[1:]),
+                          "peak_kb": round(peaks[name] / 1024, 1)}
+                   for name, ts in times.items()},
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta: float) -> list[str]:
+    """Etapas más lentas que la referencia (relativa y absolutamente)."""
+    regressions = []
+    for size, res in results.items():
+        ref = baseline.get("cases", {}).get(size, {}).get("stages", {})
+        for name, m in res["stages"].items():
+            if name not in ref:
+                continue
+            old, new = ref[name]["seconds"], m["seconds"]
+            if new > old * (1 + tolerance) and new - old > min_delta:
+                regressions.append(f"{size} · {name}: {old * 1e3:.1f} → {new * 1e3:.1f} ms "
+                                   f"(+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def report(results: dict, baseline: dict) -> None:
+    for size, res in results.items():
+        ref = baseline.get("cases", {}).get(size, {}).get("stages", {})
+        total = sum(m["seconds"] for m in res["stages"].values())
+        print(f"\n── {size}: entrada {res['input_bytes'] / 1024:.0f} KB → salida "
+              f"{res['output_bytes'] / 1024:.0f} KB · total {total * 1e3:.1f} ms · "
+              f"RSS pico {res['peak_rss_kb'] or 0:.0f} KB")
+        print(f"   {'etapa':<36}{'ms':>10}{'ref ms':>10}{'Δ':>8}{'pico KB':>12}")
+        for name, m in res["stages"].items():
+            old = ref.get(name, {}).get("seconds")
+            delta = f"{(m['seconds'] / old - 1) * 100:+.0f}%" if old else ""
+            print(f"   {name:<36}{m['seconds'] * 1e3:>10.1f}"
+                  f"{(old or 0) * 1e3:>10.1f}{delta:>8}{m['peak_kb']:>12.0f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    from synthetic import SIZES
+
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("--sizes", nargs="+", default=["small", "medium", "large"], choices=list(SIZES))
+    ap.add_argument("-n", "--repeat", type=int, default=3, help="repeticiones por etapa")
+    ap.add_argument("--tolerance", type=float, default=0.25,
+                    help="lentitud relativa admitida frente a la referencia (0.25 = +25%%)")
+    ap.add_argument("--min-delta-ms", type=float, default=5.0,
+                    help="diferencias menores se consideran ruido")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--json", type=Path, help="guarda también los resultados en este archivo")
+    args = ap.parse_args(argv)
+
+    results = {}
+    for size in args.sizes:                             # un proceso limpio por tamaño
+        with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn")) as pool:
+            results[size] = pool.submit(run_case, size, args.repeat).result()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    report(results, baseline)
+
+    doc = {"machine": f"{platform.system()} {platform.machine()} · Python {platform.python_version()}",
+           "cases": results}
+    if args.json:
+        args.json.write_text(json.dumps(doc, indent=2))
+    if args.update_baseline:
+        merged = {**baseline, "machine": doc["machine"],
+                  "cases": {**baseline.get("cases", {}), **results}}
+        args.baseline.write_text(json.dumps(merged, indent=2) + "\n")
+        print(f"\nReferencia actualizada: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms / 1e3)
+    if regressions:
+        print("\n⚠️  Regresiones frente a la referencia:")
+        print("\n".join(f"   {r}" for r in regressions))
+        return 1
+    print("\nSin regresiones." if baseline else "\nSin referencia: usa --update-baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+# benchmarks/bench_sheets.py
+"""
+Un solo archivo: plantillas en secuencia frente a renderizadas en paralelo.
+
+    python -m benchmarks.bench_sheets                    # tamaño large, 2 y 4 procesos
+    python -m benchmarks.bench_sheets --size medium -j 2 -n 5
+
+Compara `run_pipeline(data)` con `run_pipeline(data, sheet_workers=N)`
+(pool ya arrancado: el coste de crear los procesos no entra en la
+medida) y comprueba que ambos paquetes tienen las mismas partes, salvo
+la fecha de guardado de docProps/core.xml. La mejora está acotada por la
+hoja más pesada (normalmente D) y por el nº de núcleos de la máquina.
+"""
+from __future__ import annotations
+
+import argparse, io, os, statistics, sys, time, zipfile
+
+
+def _parts(data: bytes) -> dict[str, bytes]:
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        return {n: zf.read(n) for n in zf.namelist() if n != "docProps/core.xml"}
+
+
+def _median(fn, repeat: int) -> tuple[float, bytes]:
+    times, out = [], b""
+    for _ in range(repeat + 1):                         # la 1.ª es calentamiento
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times[1:]), out
+
+
+def main(argv: list[str] | None = None) -> int:
+    from batch import make_pool
+    from pipeline import run_pipeline
+    from synthetic import SIZES, make_workbook
+
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("--size", default="large", choices=list(SIZES))
+    ap.add_argument("-j", "--workers", type=int, nargs="+", default=[2, 4],
+                    help="procesos a probar")
+    ap.add_argument("-n", "--repeat", type=int, default=3, help="repeticiones por variante")
+    args = ap.parse_args(argv)
+
+    data = make_workbook(**SIZES[args.size])
+    ref_secs, ref = _median(lambda: run_pipeline(data)[1], args.repeat)
+    print(f"{args.size}: entrada {len(data) / 1024:.0f} KB · {os.cpu_count()} CPU\n")
+    print(f"{'variante':<20}{'ms':>10}{'aceleración':>13}")
+    print(f"{'secuencial':<20}{ref_secs * 1e3:>10.0f}{'':>13}")
+    failed = False
+    for workers in args.workers:
+        with make_pool(workers) as pool:
+            secs, out = _median(lambda: run_pipeline(data, sheet_workers=workers,
+                                                     executor=pool)[1], args.repeat)
+        same = _parts(out) == _parts(ref)
+        failed |= not same
+        print(f"{f'{workers} procesos':<20}{secs * 1e3:>10.0f}{ref_secs / secs:>12.2f}×"
+              f"{'' if same else '  ⚠️ contenido distinto'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# benchmarks/bench_startup.py
+"""
+Arranque en frío: coste de importación y latencia de la primera petición.
+
+    python -m benchmarks.bench_startup            # 5 procesos nuevos por medida
+    python -m benchmarks.bench_startup -n 10 --size medium
+
+Cada medida se hace en un intérprete nuevo (nada importado, nada en caché):
+  • importaciones : página de login (solo streamlit), módulos que la app
+                    carga tras el login, y pandas/openpyxl por separado
+  • 1.ª petición  : run_pipeline en frío, la 2.ª ya caliente, y la 1.ª
+                    tras `warmup.warm_up()` (lo que hace BID_WARMUP=1)
+"""
+from __future__ import annotations
+
+import argparse, json, statistics, subprocess, sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORTS = {
+    "login (streamlit)": "streamlit",
+    "app tras login": "pipeline, cache, batch, jobs, store",
+    "pandas": "pandas",
+    "openpyxl": "openpyxl",
+}
+
+_IMPORT = """
+import time
+t = time.perf_counter()
+import {mods}
+print(time.perf_counter() - t)
+"""
+
+_REQUEST = """
+import json, time
+from synthetic import SIZES, make_workbook
+data = make_workbook(**SIZES[{size!r}])
+if {warm}:
+    from warmup import warm_up
+    warm_up()
+from pipeline import run_pipeline
+t = time.perf_counter(); run_pipeline(data); first = time.perf_counter() - t
+t = time.perf_counter(); run_pipeline(data); second = time.perf_counter() - t
+print(json.dumps([first, second]))
+"""
+
+
+def _run(code: str) -> str:
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                         capture_output=True, text=True)
+    return out.stdout.strip().splitlines()[-1]
+
+
+def measure(repeat: int, size: str) -> dict[str, float]:
+    res: dict[str, list[float]] = {}
+    for _ in range(repeat):
+        for label, mods in IMPORTS.items():
+            res.setdefault(f"import · {label}", []).append(float(_run(_IMPORT.format(mods=mods))))
+        first, second = json.loads(_run(_REQUEST.format(size=size, warm=False)))
+        res.setdefault("1.ª petición (frío)", []).append(first)
+        res.setdefault("2.ª petición (caliente)", []).append(second)
+        first, _ = json.loads(_run(_REQUEST.format(size=size, warm=True)))
+        res.setdefault("1.ª petición tras warm_up()", []).append(first)
+    return {k: statistics.median(v) for k, v in res.items()}
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("-n", "--repeat", type=int, default=5, help="procesos nuevos por medida")
+    ap.add_argument("--size", default="small", help="tamaño sintético de la petición")
+    ap.add_argument("--json", type=Path, help="guarda también los resultados en este archivo")
+    args = ap.parse_args(argv)
+
+    results = measure(args.repeat, args.size)
+    print(f"{'medida (mediana de ' + str(args.repeat) + ')':<40}{'ms':>10}")
+    for name, secs in results.items():
+        print(f"{name:<40}{secs * 1e3:>10.1f}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
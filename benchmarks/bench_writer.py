@@ -0,0 +1,95 @@
+# benchmarks/bench_writer.py
+"""
+Guardado del .xlsx: `wb.save` de openpyxl frente a writer.save_workbook.
+
+    python -m benchmarks.bench_writer                    # tamaño large, 1 y 4 hilos
+    python -m benchmarks.bench_writer --size medium -j 1 2 8 -n 5
+
+El libro se construye una vez y se guarda N veces por variante. Para cada
+una se separa la serialización XML (igual en todas) de la compresión, y se
+comprueba que el resultado es un ZIP íntegro que openpyxl vuelve a abrir
+con las mismas hojas.
+"""
+from __future__ import annotations
+
+import argparse, io, statistics, sys, time, zipfile
+
+
+def _workbook(size: str):
+    from openpyxl import Workbook
+    from framework import build_framework
+    from pipeline import BUILDERS, SHEET_RESULTS, SHEET_SOLUTIONS, read_inputs
+    from styles import register_styles
+    from synthetic import SIZES, make_workbook
+
+    frames = read_inputs(make_workbook(**SIZES[size]))
+    fw = build_framework(frames[SHEET_RESULTS], frames[SHEET_SOLUTIONS])
+    wb = Workbook()
+    register_styles(wb)
+    for builder in BUILDERS.values():
+        builder(wb, framework=fw)
+    return wb
+
+
+def _check(data: bytes, sheetnames: list[str]) -> None:
+    from openpyxl import load_workbook
+
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        bad = zf.testzip()
+    if bad is not None:
+        raise AssertionError(f"CRC incorrecto en {bad}")
+    if load_workbook(io.BytesIO(data)).sheetnames != sheetnames:
+        raise AssertionError("las hojas no coinciden tras reabrir el libro")
+
+
+def _median(fn, repeat: int) -> tuple[float, bytes]:
+    times, out = [], b""
+    for _ in range(repeat + 1):                         # la 1.ª es calentamiento
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times[1:]), out
+
+
+def main(argv: list[str] | None = None) -> int:
+    from openpyxl.writer.excel import ExcelWriter
+    from writer import PRESETS, repack
+
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("--size", default="large", help="tamaño sintético (synthetic.SIZES)")
+    ap.add_argument("-j", "--workers", type=int, nargs="+", default=[1, 4],
+                    help="hilos de compresión a probar")
+    ap.add_argument("-n", "--repeat", type=int, default=3, help="repeticiones por variante")
+    args = ap.parse_args(argv)
+
+    wb = _workbook(args.size)
+
+    def openpyxl_save() -> bytes:
+        wb.save(out := io.BytesIO())
+        return out.getvalue()
+
+    def serialize() -> bytes:
+        ExcelWriter(wb, zipfile.ZipFile(raw := io.BytesIO(), "w", zipfile.ZIP_STORED)).save()
+        return raw.getvalue()
+
+    ref_secs, ref = _median(openpyxl_save, args.repeat)
+    xml_secs, raw = _median(serialize, args.repeat)
+    _check(ref, wb.sheetnames)
+    print(f"{args.size}: {len(raw) / 2**20:.1f} MB de XML · serialización {xml_secs * 1e3:.0f} ms "
+          f"(común a todas las variantes)\n")
+    print(f"{'variante':<28}{'compresión ms':>15}{'total ms':>10}{'KB':>10}{'vs wb.save':>12}")
+    print(f"{'wb.save (openpyxl, 6)':<28}{(ref_secs - xml_secs) * 1e3:>15.1f}"
+          f"{ref_secs * 1e3:>10.0f}{len(ref) / 1024:>10.0f}{'':>12}")
+    for preset in PRESETS:
+        for workers in args.workers:
+            secs, data = _median(lambda: repack(raw, compression=preset, workers=workers),
+                                 args.repeat)
+            _check(data, wb.sheetnames)
+            total = xml_secs + secs
+            print(f"{f'{preset} · {workers} hilo(s)':<28}{secs * 1e3:>15.1f}{total * 1e3:>10.0f}"
+                  f"{len(data) / 1024:>10.0f}{(total / ref_secs - 1) * 100:>+11.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
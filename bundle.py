@@ -0,0 +1,78 @@
+# bundle.py
+"""
+ZIP de resultados construido de forma incremental: cada archivo se añade
+una vez, cuando termina, y el paquete se cierra una sola vez por lote.
+
+Los .xlsx ya son ZIP comprimidos, así que por defecto se guardan sin
+recomprimir ("store"): recomprimirlos gasta CPU y apenas reduce tamaño.
+"""
+import io, zipfile
+from pathlib import PurePath
+
+ALREADY_COMPRESSED = (".xlsx", ".xlsm", ".zip", ".png", ".jpg", ".jpeg")
+
+
+class ZipBundle:
+    """
+    Parameters
+    ----------
+    target : file-like | path, optional
+        Destino del ZIP (por defecto un BytesIO en memoria).
+    level : int
+        0 = sin compresión; 1-9 = DEFLATE con ese nivel.
+    store_compressed : bool
+        Guarda sin recomprimir los formatos de ALREADY_COMPRESSED.
+    """
+
+    def __init__(self, target=None, *, level: int = 6, store_compressed: bool = True):
+        if not 0 <= level <= 9:
+            raise ValueError(f"level debe estar entre 0 y 9 (recibido {level})")
+        self.level, self.store_compressed = level, store_compressed
+        self._target = io.BytesIO() if target is None else target
+        self._zf = zipfile.ZipFile(self._target, "w")
+        self.names: list[str] = []
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _unique(self, name: str) -> str:
+        if name not in self.names:
+            return name
+        p, n = PurePath(name), 2
+
+        def numbered(n: int) -> str:        # la copia sigue en su carpeta
+            return p.with_name(f"{p.stem} ({n}){p.suffix}").as_posix()
+
+        while numbered(n) in self.names:
+            n += 1
+        return numbered(n)
+
+    def add(self, name: str, data: bytes) -> str:
+        """Añade un miembro y devuelve el nombre final (sin duplicados)."""
+        name = self._unique(name)
+        store = self.level == 0 or (self.store_compressed
+                                    and name.lower().endswith(ALREADY_COMPRESSED))
+        if store:
+            self._zf.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+        else:
+            self._zf.writestr(name, data, compress_type=zipfile.ZIP_DEFLATED,
+                              compresslevel=self.level)
+        self.names.append(name)
+        return name
+
+    def close(self) -> None:
+        if not self.closed:
+            self._zf.close()
+            self.closed = True
+
+    def getvalue(self) -> bytes:
+        """Cierra el ZIP (si hace falta) y devuelve su contenido en memoria."""
+        self.close()
+        return self._target.getvalue()
@@ -0,0 +1,185 @@
+# cache.py
+"""
+Caché de resultados direccionada por contenido.
+
+La clave es el SHA-256 de (versión de plantillas + código, bytes subidos),
+así que el mismo libro devuelve el mismo .xlsx sin volver a ejecutar
+`run_pipeline`, aunque venga de otra sesión o con otro nombre.
+
+Dos niveles:
+  • memoria : LRU acotado por nº de entradas y por bytes.
+  • disco   : opcional, acotado por bytes y con caducidad (TTL).
+"""
+from __future__ import annotations
+
+import hashlib, os, threading, time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from pipeline import TEMPLATE_VERSION
+
+# módulos cuyo código cambia el .xlsx generado
+_VERSIONED_MODULES = ("pipeline.py", "framework.py", "styles.py", "templates.py", "tables.py",
+                      "incremental.py", "writer.py", "sheetml.py")
+HASH_CHUNK = 1 * 2**20              # bloques al resumir un archivo en disco
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """TEMPLATE_VERSION + hash corto del código que genera las plantillas."""
+    h = hashlib.sha256(TEMPLATE_VERSION.encode())
+    here = Path(__file__).resolve().parent
+    for mod in _VERSIONED_MODULES:
+        h.update((here / mod).read_bytes())
+    return f"{TEMPLATE_VERSION}-{h.hexdigest()[:12]}"
+
+
+def content_key(content, version: str) -> str:
+    """SHA-256 de (versión, contenido); `content` son bytes o la ruta del archivo."""
+    h = hashlib.sha256(version.encode())
+    h.update(b"\0")
+    if isinstance(content, (bytes, bytearray)):
+        h.update(content)
+    else:                               # misma clave que con los bytes, sin cargarlos
+        with open(content, "rb") as f:
+            for block in iter(lambda: f.read(HASH_CHUNK), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+
+class ResultCache:
+    """
+    Parameters
+    ----------
+    max_items, max_bytes : int
+        Límites del nivel en memoria (se expulsa la entrada menos usada).
+    disk_dir : str | Path, optional
+        Carpeta del nivel en disco; None lo desactiva.
+    disk_max_bytes : int
+        Tamaño máximo de la carpeta de caché.
+    ttl : float, optional
+        Segundos de vida de una entrada en disco (None = sin caducidad).
+    """
+
+    def __init__(self, max_items: int = 32, max_bytes: int = 128 * 2**20, *,
+                 disk_dir=None, disk_max_bytes: int = 1 * 2**30,
+                 ttl: float | None = None, version: str | None = None):
+        self.max_items, self.max_bytes = max_items, max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes, self.ttl = disk_max_bytes, ttl
+        self.version = version or code_version()
+        self.stats = CacheStats()
+        self._mem: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+        self._mem_bytes = 0
+        self._lock = threading.Lock()
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    # ─────────────────── API ───────────────────────────────────────
+    def key(self, content, variant: str = "") -> str:
+        """`variant` distingue resultados del mismo libro con otras opciones."""
+        return content_key(content, f"{self.version}|{variant}" if variant else self.version)
+
+    def get(self, key: str) -> tuple[str, bytes] | None:
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                self.stats.memory_hits += 1
+                return self._mem[key]
+        hit = self._disk_get(key)
+        with self._lock:
+            if hit is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._mem_put(key, hit)
+        return hit
+
+    def put(self, key: str, value: tuple[str, bytes]) -> None:
+        with self._lock:
+            self._mem_put(key, value)
+        self._disk_put(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._mem_bytes = 0
+        for p in self._disk_entries():
+            p.unlink(missing_ok=True)
+
+    # ─────────────────── nivel memoria ─────────────────────────────
+    def _mem_put(self, key: str, value: tuple[str, bytes]) -> None:
+        if key in self._mem:
+            self._mem_bytes -= len(self._mem.pop(key)[1])
+        if len(value[1]) > self.max_bytes:
+            return                              # no cabe: solo disco
+        self._mem[key] = value
+        self._mem_bytes += len(value[1])
+        while len(self._mem) > self.max_items or self._mem_bytes > self.max_bytes:
+            _, (_, old) = self._mem.popitem(last=False)
+            self._mem_bytes -= len(old)
+
+    # ─────────────────── nivel disco ───────────────────────────────
+    # un fichero por entrada: <clave>-<nombre_resultado>
+    def _disk_entries(self) -> list[Path]:
+        if not self.disk_dir:
+            return []
+        return [p for p in self.disk_dir.iterdir() if p.is_file() and not p.name.startswith(".")]
+
+    def _expired(self, st: os.stat_result, now: float) -> bool:
+        return self.ttl is not None and now - st.st_mtime > self.ttl
+
+    def _disk_get(self, key: str) -> tuple[str, bytes] | None:
+        if not self.disk_dir:
+            return None
+        for p in self.disk_dir.glob(f"{key}-*"):
+            try:
+                if self._expired(p.stat(), time.time()):
+                    p.unlink(missing_ok=True)
+                    return None
+                data = p.read_bytes()
+                os.utime(p)                     # mtime = último uso (LRU)
+            except FileNotFoundError:           # expulsado por otro proceso
+                return None
+            return p.name[len(key) + 1:], data
+        return None
+
+    def _disk_put(self, key: str, value: tuple[str, bytes]) -> None:
+        if not self.disk_dir:
+            return
+        name, data = value
+        tmp = self.disk_dir / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, self.disk_dir / f"{key}-{name}")
+        self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        now, entries = time.time(), []
+        for p in self._disk_entries():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            if self._expired(st, now):
+                p.unlink(missing_ok=True)
+            else:
+                entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):      # más antiguos primero
+            if total <= self.disk_max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,282 @@
+# cli.py
+"""
+Generador por lotes sin interfaz (para tareas nocturnas).
+
+    python cli.py proyectos/ -o salida/                # un .xlsx por proyecto
+    python cli.py "proyectos/**/*.xlsx" --zip out.zip  # todo en un ZIP
+    python cli.py proyectos/ -o salida/ -j 8 --force   # 8 procesos, rehace todo
+    python cli.py proyectos/ -o salida/ -t C,D --split # solo C y D, un .xlsx por plantilla
+    python cli.py proyectos/ --portfolio cartera.xlsx  # todos en un libro de cartera
+    python cli.py proyectos/ -o salida/ --engine sheetml   # XML directo, sin celdas openpyxl
+
+Los archivos cuyo resultado ya existe, es más reciente que la entrada y se
+generó con las mismas opciones y versión del código (.bid_cli.json en
+--out-dir) se omiten (salvo con --force); si existe pero está
+desactualizado, solo se rehacen las hojas cuyos datos cambiaron. La
+salida repite las subcarpetas de las entradas (relativas a la carpeta
+común), así que con -r dos proyectos con el mismo nombre en carpetas
+distintas no se pisan. Al final imprime archivos/s, MB/s y fallos.
+"""
+from __future__ import annotations
+
+import argparse, glob, json, os, sys, time
+from concurrent.futures import FIRST_COMPLETED, wait
+from pathlib import Path
+
+from batch import PARALLEL_SHEETS_MIN, default_workers, make_pool
+from bundle import ZipBundle
+from cache import code_version
+from pipeline import ENGINES, run_pipeline, select_templates
+from validation import check
+from writer import resolve_levels
+
+
+def collect_inputs(patterns: list[str], recursive: bool = False) -> list[Path]:
+    """Expande directorios y globs a una lista ordenada de .xlsx (sin duplicados)."""
+    found: dict[Path, None] = {}
+    for pat in patterns:
+        p = Path(pat)
+        if p.is_dir():
+            matches = p.glob("**/*.xlsx" if recursive else "*.xlsx")
+        else:
+            matches = map(Path, glob.glob(pat, recursive=True))
+        for m in sorted(matches):
+            if m.is_file() and m.suffix.lower() == ".xlsx" and not m.name.startswith("~$"):
+                found.setdefault(m.resolve())
+    return list(found)
+
+
+# en --out-dir: con qué opciones y versión del código se generó cada resultado
+STAMPS = ".bid_cli.json"
+
+
+def output_name(src: Path, result_name: str = "resultado.xlsx") -> str:
+    return f"{src.stem}_{result_name}"
+
+
+def output_dirs(inputs: list[Path]) -> dict[Path, Path]:
+    """
+    Subcarpeta de salida de cada entrada: su ruta relativa a la carpeta
+    común de todas, para que a.xlsx y sub/a.xlsx (con -r) no se pisen.
+    """
+    root = Path(os.path.commonpath([p.parent for p in inputs]))
+    return {p: p.parent.relative_to(root) for p in inputs}
+
+
+def load_stamps(out_dir: Path) -> dict[str, str]:
+    """{resultado relativo a --out-dir: opciones y versión con que se generó}."""
+    try:
+        return json.loads((out_dir / STAMPS).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_stamps(out_dir: Path, stamps: dict[str, str]) -> None:
+    tmp = out_dir / f"{STAMPS}.tmp"
+    tmp.write_text(json.dumps(stamps, ensure_ascii=False, indent=1, sort_keys=True),
+                   encoding="utf-8")
+    tmp.replace(out_dir / STAMPS)
+
+
+def is_up_to_date(src: Path, dst: Path, stamp: str | None = None,
+                  recorded: str | None = None) -> bool:
+    """`dst` es más reciente que `src` y, si se pasa `stamp`, se generó con él."""
+    if not (dst.exists() and dst.stat().st_mtime >= src.stat().st_mtime):
+        return False
+    return stamp is None or recorded == stamp
+
+
+def _run_file(path: str, previous: str | None = None,
+              options: dict | None = None) -> tuple[str, bytes, float]:
+    """Worker: lee y procesa un archivo (solo viajan las rutas al proceso hijo)."""
+    t0 = time.perf_counter()
+    name, content = run_pipeline(Path(path), previous=previous, **(options or {}))
+    return name, content, time.perf_counter() - t0
+
+
+def _templates(value: str) -> tuple[str, ...]:
+    try:
+        return select_templates(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+
+
+def _compression(value: str) -> str:
+    try:
+        resolve_levels(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+    return value
+
+
+def _portfolio(inputs: list[Path], args) -> int:
+    """--portfolio: marcos en paralelo (pool de batch) y un único guardado."""
+    from batch import DONE, run_batch
+    from portfolio import build_portfolio, timed_load
+
+    t0 = time.perf_counter()
+    items = run_batch([(p.name, p) for p in inputs], workers=args.workers,
+                      options={"templates": args.templates}, task=timed_load)
+    failed = {it.name: it.error for it in items if it.status != DONE}
+    for name, error in failed.items():
+        print(f"❌ {name}: {error}", file=sys.stderr, flush=True)
+    projects = [(it.name, it.result) for it in items if it.status == DONE]
+    if projects:
+        data = build_portfolio(projects, templates=args.templates, failed=failed,
+                               compression=args.compression)
+        args.portfolio.write_bytes(data)
+    elapsed = max(time.perf_counter() - t0, 1e-9)
+    print(f"\n{len(projects)} proyectos en {args.portfolio} · {len(failed)} fallos "
+          f"en {elapsed:.1f}s")
+    return 1 if failed or not projects else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="cli.py", description=__doc__.split("\n\n")[0].strip(),
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("inputs", nargs="+", help="directorios, archivos .xlsx o globs")
+    dest = ap.add_mutually_exclusive_group(required=True)
+    dest.add_argument("-o", "--out-dir", type=Path, help="carpeta de salida")
+    dest.add_argument("--zip", type=Path, help="escribe todos los resultados en este ZIP")
+    dest.add_argument("--portfolio", type=Path,
+                      help="un solo libro con todos los proyectos y una hoja Índice")
+    ap.add_argument("--zip-level", type=int, default=0, choices=range(10), metavar="0-9",
+                    help="nivel DEFLATE del ZIP; los .xlsx se guardan sin recomprimir "
+                         "(por defecto %(default)s)")
+    ap.add_argument("-j", "--workers", type=int, default=default_workers(),
+                    help="procesos en paralelo (por defecto %(default)s)")
+    ap.add_argument("-r", "--recursive", action="store_true", help="buscar en subcarpetas")
+    ap.add_argument("--force", action="store_true",
+                    help="regenerar aunque esté al día y sin reutilizar hojas del resultado previo")
+    ap.add_argument("-t", "--templates", type=_templates, default=None, metavar="C,E,F,D",
+                    help="plantillas a generar (por defecto todas)")
+    ap.add_argument("--split", action="store_true",
+                    help="un .xlsx por plantilla (proyecto_plantillas.zip por proyecto)")
+    ap.add_argument("--compression", default="balanced", type=_compression,
+                    metavar="fast|balanced|smallest|0-9",
+                    help="compresión de cada .xlsx (por defecto %(default)s)")
+    ap.add_argument("--engine", default="openpyxl", choices=ENGINES,
+                    help="motor de salida: sheetml escribe el XML por filas, más rápido "
+                         "en marcos grandes (por defecto %(default)s)")
+    ap.add_argument("-q", "--quiet", action="store_true", help="solo el resumen final")
+    args = ap.parse_args(argv)
+    options = {"templates": args.templates, "split": args.split, "compression": args.compression,
+               "engine": args.engine}
+    result_name = "plantillas.zip" if args.split else "resultado.xlsx"
+
+    inputs = collect_inputs(args.inputs, args.recursive)
+    if not inputs:
+        print("No se encontraron archivos .xlsx", file=sys.stderr)
+        return 2
+
+    if args.portfolio:
+        return _portfolio(inputs, args)
+
+    dirs = output_dirs(inputs)
+    # un resultado solo está al día si salió de las mismas opciones y código
+    # (tras una pasada completa, "-t C" o "--split" no deben omitirse)
+    stamp = f"{code_version()}|{sorted(options.items())!r}"
+    stamps: dict[str, str] = {}
+    skipped = 0
+    if args.out_dir:
+        args.out_dir.mkdir(parents=True, exist_ok=True)
+        stamps = load_stamps(args.out_dir)
+        if not args.force:
+            rel = {p: (dirs[p] / output_name(p, result_name)).as_posix() for p in inputs}
+            todo = [p for p in inputs
+                    if not is_up_to_date(p, args.out_dir / rel[p], stamp, stamps.get(rel[p]))]
+            skipped = len(inputs) - len(todo)
+            inputs = todo
+
+    log = (lambda *a: None) if args.quiet else (lambda *a: print(*a, flush=True))
+    zf = ZipBundle(args.zip, level=args.zip_level) if args.zip else None
+    ok = failed = in_bytes = out_bytes = 0
+    t0 = time.perf_counter()
+
+    def previous(src: Path) -> str | None:
+        """Resultado anterior en --out-dir: solo se rehacen las hojas que cambian."""
+        if args.out_dir is None or args.force or args.split:
+            return None
+        dst = args.out_dir / dirs[src] / output_name(src)
+        return str(dst) if dst.exists() else None
+
+    def write(src: Path, name: str, content: bytes, secs: float) -> None:
+        nonlocal ok, in_bytes, out_bytes
+        fname = (dirs[src] / output_name(src, name)).as_posix()
+        if zf is not None:
+            fname = zf.add(fname, content)
+        else:
+            dst = args.out_dir / fname
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            dst.write_bytes(content)
+            stamps[fname] = stamp
+        ok += 1
+        in_bytes += src.stat().st_size
+        out_bytes += len(content)
+        log(f"✅ {src.name} → {fname} ({secs:.2f}s)")
+
+    def fail(src: Path, exc: Exception) -> None:
+        nonlocal failed
+        failed += 1
+        print(f"❌ {src.name}: {type(exc).__name__}: {exc}", file=sys.stderr, flush=True)
+
+    def valid(src: Path) -> bool:
+        """Validación previa (milisegundos): los archivos malos no llegan al pool."""
+        try:
+            report = check(src, args.templates)
+        except ValueError as exc:
+            fail(src, exc)
+            return False
+        for w in report.warnings:
+            print(f"⚠️  {src.name}: {w}", file=sys.stderr, flush=True)
+        return True
+
+    try:
+        if args.workers <= 1 or len(inputs) <= 1:
+            if args.workers > 1 and inputs and inputs[0].stat().st_size >= PARALLEL_SHEETS_MIN:
+                # un solo archivo grande: sus plantillas se reparten entre procesos
+                options = {**options, "sheet_workers": args.workers}
+            for src in inputs:
+                if not valid(src):
+                    continue
+                try:
+                    write(src, *_run_file(str(src), previous(src), options))
+                except Exception as exc:
+                    fail(src, exc)
+        else:
+            # como mucho 2×workers archivos en vuelo: memoria acotada
+            with make_pool(args.workers) as pool:
+                queue, running = iter(inputs), {}
+                while True:
+                    while len(running) < 2 * args.workers:
+                        src = next(queue, None)
+                        if src is None:
+                            break
+                        if not valid(src):
+                            continue
+                        running[pool.submit(_run_file, str(src), previous(src), options)] = src
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        src = running.pop(fut)
+                        try:
+                            write(src, *fut.result())
+                        except Exception as exc:
+                            fail(src, exc)
+    finally:
+        if zf is not None:
+            zf.close()
+        if args.out_dir and stamps:
+            save_stamps(args.out_dir, stamps)
+
+    elapsed = max(time.perf_counter() - t0, 1e-9)
+    print(f"\n{ok} generados · {skipped} al día (omitidos) · {failed} fallos "
+          f"en {elapsed:.1f}s — {ok / elapsed:.2f} archivos/s, "
+          f"{in_bytes / 2**20 / elapsed:.2f} MB/s leídos, "
+          f"{out_bytes / 2**20:.1f} MB escritos")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# framework.py
+"""
+Marco de resultados compartido por los cuatro builders de `tables.py`.
+
+Se construye una sola vez por archivo (operaciones por columnas, sin
+`iterrows`) y cada plantilla lo recibe ya ordenado.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:                       # pandas se importa al usarse (arranque rápido)
+    import pandas as pd
+
+
+def natural_key(number: str) -> tuple:
+    """
+    Clave de orden natural para numeraciones tipo 1.2, 1.10, 2.1.A.
+    Los segmentos numéricos se comparan como enteros y el resto como texto
+    (van después de los numéricos), así que nunca lanza ValueError.
+    """
+    return tuple((0, int(p)) if p.isdecimal() else (1, p)
+                 for p in str(number).strip().split("."))
+
+
+@dataclass(frozen=True)
+class Objective:
+    key: str                     # numeración del Objetivo Específico (1.1, 1.2 …)
+    name: str | None             # None si solo aparecen sus indicadores
+    indicators: tuple[str, ...]  # nombres de los indicadores, ordenados
+    sort_key: tuple
+
+    @property
+    def label(self) -> str:
+        return self.name or f"[Objetivo {self.key}]"
+
+
+@dataclass(frozen=True)
+class ResultsFramework:
+    general_objective: str | None
+    objectives: tuple[Objective, ...]         # en orden natural de `key`
+    solutions: tuple[tuple[object, object], ...] = ()   # (Name, ID) de cada 'Solution'
+
+    @property
+    def n_indicators(self) -> int:
+        return sum(len(o.indicators) for o in self.objectives)
+
+
+def build_framework(results_df: pd.DataFrame,
+                    components_df: pd.DataFrame | None = None) -> ResultsFramework:
+    """
+    Convierte las hojas 'SDO & Result Indicators' y (opcional)
+    'Solutions & Outputs' en un ResultsFramework.
+
+    Parameters
+    ----------
+    results_df : pd.DataFrame
+        Columnas requeridas: Element type, Number, Name.
+    components_df : pd.DataFrame, optional
+        Columnas requeridas: Element type, Name, ID.
+    """
+    import pandas as pd
+
+    etype = results_df["Element type"]
+    number = results_df["Number"].astype(str).str.strip()
+    name = results_df["Name"]
+
+    general = name[etype == "General Objective"]
+    general_objective = general.iloc[0] if len(general) else None
+
+    # Objetivos Específicos: el primero que aparece con cada numeración
+    is_obj = etype == "Specific Objective"
+    obj_names = pd.Series(name[is_obj].values, index=number[is_obj].values)
+    obj_names = obj_names[~obj_names.index.duplicated()]
+
+    # Indicadores: prefijo de 2 niveles (1.1.A → 1.1), ordenados por nombre
+    is_ind = etype == "Result indicator"
+    inds = pd.DataFrame({
+        "key": number[is_ind].str.split(".").str[:2].str.join("."),
+        "name": name[is_ind],
+    }).sort_values("name", kind="stable")
+    ind_groups = inds.groupby("key", sort=False)["name"].agg(tuple)
+
+    keys = obj_names.index.union(ind_groups.index, sort=False).unique()
+    sort_keys = {k: natural_key(k) for k in keys}
+    objectives = tuple(
+        Objective(key=k,
+                  name=obj_names.get(k),
+                  indicators=ind_groups.get(k, ()),
+                  sort_key=sort_keys[k])
+        for k in sorted(keys, key=sort_keys.__getitem__)
+    )
+
+    solutions = ()
+    if components_df is not None:
+        sol = components_df[components_df["Element type"].str.lower() == "solution"]
+        solutions = tuple(zip(sol["Name"], sol["ID"]))
+
+    return ResultsFramework(general_objective, objectives, solutions)
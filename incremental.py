@@ -0,0 +1,143 @@
+# incremental.py
+"""
+Regeneración incremental: solo se reconstruyen las hojas cuyos datos de
+entrada cambiaron respecto a un resultado anterior.
+
+Cada hoja lleva una huella (hash de la versión del código + exactamente
+los datos del marco que lee su builder), guardada en las propiedades
+personalizadas del libro. Al volver a procesar con el resultado anterior:
+
+  • hojas con la misma huella → su XML se copia tal cual del .xlsx previo
+  • hojas con huella distinta → se vuelven a construir con openpyxl
+
+Las hojas reutilizadas se crean vacías en el libro nuevo (mismo título y
+posición) y se sustituyen en el paquete al guardar. Es seguro porque los
+estilos se registran siempre en el mismo orden (styles.register_styles) y
+openpyxl escribe los textos en línea: si el paquete previo no cumple eso
+(styles.xml distinto, sharedStrings), se reconstruye todo.
+
+El mismo ensamblado (`assemble`) junta las hojas renderizadas por
+separado en el modo paralelo de pipeline.run_pipeline, y las que escribe
+directamente el motor sheetml.py (XML suelto, ya con los índices de
+estilo de register_styles).
+"""
+from __future__ import annotations
+
+import hashlib, io, posixpath, zipfile
+from xml.etree.ElementTree import ParseError, fromstring
+
+from openpyxl.packaging.custom import CustomPropertyList, StringProperty
+
+from framework import ResultsFramework
+from writer import DEFAULT as DEFAULT_COMPRESSION, repack
+
+PROP_PREFIX = "bid_fp_"                 # propiedades personalizadas: bid_fp_C, bid_fp_D, …
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL  = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG  = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def sheet_inputs(fw: ResultsFramework) -> dict[str, tuple]:
+    """Lo que lee cada builder del marco (nada más entra en su huella)."""
+    objectives = tuple((o.key, o.name, o.indicators) for o in fw.objectives)
+    return {
+        "C": (fw.general_objective, objectives),
+        "E": objectives,
+        "F": objectives,
+        "D": (objectives, fw.solutions),
+    }
+
+
+def sheet_fingerprints(fw: ResultsFramework, version: str) -> dict[str, str]:
+    return {key: hashlib.sha256(repr((version, key, data)).encode()).hexdigest()[:32]
+            for key, data in sheet_inputs(fw).items()}
+
+
+def stamp(wb, fingerprints: dict[str, str]) -> None:
+    """Guarda las huellas en las propiedades personalizadas del libro."""
+    for key, fp in fingerprints.items():
+        wb.custom_doc_props.append(StringProperty(name=PROP_PREFIX + key, value=fp))
+
+
+# ─────────────────── lectura del resultado anterior ────────────────
+def _open(previous) -> zipfile.ZipFile:
+    return zipfile.ZipFile(io.BytesIO(previous) if isinstance(previous, (bytes, bytearray))
+                           else previous)
+
+
+def _sheet_parts(zf: zipfile.ZipFile) -> dict[str, str]:
+    """{título de hoja: ruta de su XML dentro del paquete}."""
+    rels = {r.get("Id"): r.get("Target")
+            for r in fromstring(zf.read("xl/_rels/workbook.xml.rels")).iter(f"{_NS_PKG}Relationship")}
+    parts = {}
+    for sh in fromstring(zf.read("xl/workbook.xml")).iter(f"{_NS_MAIN}sheet"):
+        target = rels[sh.get(f"{_NS_REL}id")]
+        parts[sh.get("name")] = (target.lstrip("/") if target.startswith("/")
+                                 else posixpath.normpath(posixpath.join("xl", target)))
+    return parts
+
+
+def _fingerprints(zf: zipfile.ZipFile) -> dict[str, str]:
+    try:
+        props = CustomPropertyList.from_tree(fromstring(zf.read("docProps/custom.xml")))
+    except KeyError:
+        return {}
+    return {p.name[len(PROP_PREFIX):]: p.value for p in props if p.name.startswith(PROP_PREFIX)}
+
+
+class Previous:
+    """Resultado anterior abierto para reutilizar sus hojas."""
+
+    def __init__(self, previous):
+        self.zf = _open(previous)
+        self.fingerprints = _fingerprints(self.zf)
+        self.parts = _sheet_parts(self.zf) if self.fingerprints else {}
+
+    def reusable(self, fingerprints: dict[str, str], titles: dict[str, str]) -> set[str]:
+        """Plantillas cuya huella coincide (y cuya hoja existe en el paquete)."""
+        if "xl/sharedStrings.xml" in self.zf.namelist():
+            return set()                # textos compartidos entre hojas: no se puede separar
+        return {key for key, fp in fingerprints.items()
+                if self.fingerprints.get(key) == fp and titles[key] in self.parts}
+
+    def sheet_xml(self, title: str) -> bytes:
+        return self.zf.read(self.parts[title])
+
+
+def open_previous(previous) -> Previous | None:
+    """Previous, o None si `previous` no es un resultado legible de esta app."""
+    try:
+        return Previous(previous)
+    except (OSError, KeyError, ParseError, zipfile.BadZipFile):
+        return None
+
+
+# ─────────────────── ensamblado del paquete ────────────────────────
+def splice(package: bytes, previous: Previous, titles: list[str],
+           compression=DEFAULT_COMPRESSION) -> bytes | None:
+    """
+    Sustituye en `package` las hojas `titles` (vacías) por las del resultado
+    anterior y lo reescribe con `compression` (writer.py). Devuelve None si
+    los estilos no coinciden (hay que reconstruir).
+    """
+    return assemble(package, {t: previous for t in titles}, compression)
+
+
+def assemble(package: bytes, sources: dict[str, Previous | bytes],
+             compression=DEFAULT_COMPRESSION) -> bytes | None:
+    """
+    Como `splice`, pero cada hoja vacía de `package` ({título: origen})
+    sale de su propio paquete, o es directamente el XML de la hoja
+    (bytes). Los paquetes deben compartir styles.xml con `package`; si
+    no, devuelve None.
+    """
+    src = zipfile.ZipFile(io.BytesIO(package))
+    styles = src.read("xl/styles.xml")
+    if any(source.zf.read("xl/styles.xml") != styles
+           for source in sources.values() if isinstance(source, Previous)):
+        return None
+    parts = _sheet_parts(src)
+    return repack(package, compression=compression,
+                  replace={parts[t]: source if isinstance(source, bytes) else source.sheet_xml(t)
+                           for t, source in sources.items()})
@@ -0,0 +1,353 @@
+# jobs.py
+"""
+Cola de trabajos en segundo plano (dentro del proceso de Streamlit).
+
+Cada lote enviado es un `Job` con su id, su estado y su propia carpeta de
+resultados (store.ResultStore). Los lotes corren en hilos del gestor, y
+estos reparten los archivos al pool de procesos de batch.py. La página
+solo consulta el estado, así que un rerun, un clic o una reconexión no
+interrumpen el trabajo, y un usuario puede encolar varios lotes.
+
+    jm = JobManager(executor=pool)
+    job_id = jm.submit([(nombre, archivo_subido), …], owner="ana")
+    jm.get(job_id).status          # ⏳ en cola → ⚙️ procesando → ✅ listo
+    jm.cancel(job_id)
+
+Con `portfolio=True` el lote no genera un archivo por proyecto sino un
+solo libro de cartera (portfolio.py).
+
+Las entradas se vuelcan a la carpeta del lote al encolarlo, y desde ahí
+solo circulan rutas: ni la cola ni el pool guardan copias de los archivos.
+Los resultados de todos los lotes de un usuario comparten un presupuesto
+de disco (`owner_bytes`), y los lotes caducados se borran periódicamente
+aunque nadie vuelva a usar la página.
+"""
+from __future__ import annotations
+
+import itertools, os, threading, time, weakref
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from batch import CANCELLED, DONE, FAILED, PENDING, RUNNING, BatchItem, run_batch
+from bundle import ZipBundle
+from pipeline import input_size
+from portfolio import PORTFOLIO_NAME, build_portfolio, timed_load
+from store import ResultStore, StoreFull
+from writer import DEFAULT as DEFAULT_COMPRESSION
+
+# un trabajo usa los mismos estados que sus archivos (batch.py)
+ACTIVE = (PENDING, RUNNING)
+
+ZIP_NAME = "bid_templates.zip"
+
+
+def output_name(archivo: str, resultado: str = "resultado.xlsx") -> str:
+    """proyecto.xlsx → proyecto_resultado.xlsx"""
+    return f"{archivo.rsplit('.', 1)[0]}_{resultado}"
+
+
+@dataclass
+class Job:
+    id: str
+    owner: str
+    items: list[BatchItem]
+    store: ResultStore
+    status: str = PENDING
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    outputs: dict[int, str] = field(default_factory=dict)    # índice → nombre en store
+    zip: str | None = None
+    portfolio: str | None = None                              # libro de cartera en store
+    warnings: list[str] = field(default_factory=list)
+    error: str | None = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE
+
+    @property
+    def progress(self) -> float:
+        done = sum(it.status not in ACTIVE for it in self.items)
+        return done / len(self.items) if self.items else 1.0
+
+    @property
+    def seconds(self) -> float | None:
+        if self.started is None:
+            return None
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def results(self) -> list[str]:
+        """Nombres de los resultados guardados, en el orden de entrada."""
+        return [name for _, name in sorted(self.outputs.items())]
+
+    def previous_for(self, archivo: str) -> str | None:
+        """Ruta del resultado de `archivo` en este trabajo (para regenerar incrementalmente)."""
+        for i, it in enumerate(self.items):
+            if it.name == archivo and i in self.outputs:
+                return str(self.store.path(self.outputs[i]))
+        return None
+
+
+def _sweep(ref, stop: threading.Event) -> None:
+    """Hilo de limpieza: purga los trabajos caducados mientras el gestor exista."""
+    while (jm := ref()) is not None:
+        interval = min(max(jm.retention / 4, 1), 300)
+        del jm                          # sin referencia fuerte mientras espera
+        if stop.wait(interval):
+            return
+        if (jm := ref()) is not None:
+            jm.purge()
+            del jm
+
+
+class JobManager:
+    """
+    Parameters
+    ----------
+    executor : Executor, optional
+        Pool de procesos compartido al que van los archivos (batch.make_pool).
+    max_running : int
+        Lotes que se procesan a la vez; el resto espera en cola.
+    retention : float
+        Segundos que se conservan los trabajos terminados (y sus archivos).
+    store_bytes : int
+        Presupuesto de disco de cada trabajo.
+    owner_bytes : int
+        Presupuesto de disco de todos los trabajos de un mismo usuario
+        (hasta que caducan o los borra con `forget`): los resultados que
+        no caben se descartan con un aviso en `Job.warnings`.
+    admission : AdmissionController, optional
+        Turnos globales por archivo (admission.py): limita las ejecuciones
+        simultáneas y la memoria estimada, con cola justa entre usuarios.
+    """
+
+    def __init__(self, executor: Executor | None = None, *, max_running: int = 2,
+                 retention: float = 3600, store_bytes: int = 512 * 2**20,
+                 owner_bytes: int = 512 * 2**20, cache=None, zip_level: int = 6,
+                 admission=None):
+        self.executor, self.cache, self.zip_level = executor, cache, zip_level
+        self.admission = admission
+        self.retention, self.store_bytes, self.owner_bytes = retention, store_bytes, owner_bytes
+        self._runner = ThreadPoolExecutor(max_running, thread_name_prefix="bid-job")
+        self._jobs: dict[str, Job] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()          # comprobar y escribir en el presupuesto
+        # los trabajos caducados se borran aunque nadie vuelva a enviar ni consultar
+        self._stop = threading.Event()
+        weakref.finalize(self, self._stop.set)
+        threading.Thread(target=_sweep, args=(weakref.ref(self), self._stop), daemon=True,
+                         name="bid-job-purge").start()
+
+    # ─────────────────── API ───────────────────────────────────────
+    def submit(self, files: list[tuple[str, object]], *, owner: str,
+               workers: int | None = None, executor: Executor | None = None,
+               metrics: bool = False, options: dict | None = None,
+               portfolio: bool = False) -> str:
+        """Encola un lote y devuelve su id; el trabajo empieza en segundo plano.
+
+        Cada archivo es bytes, un archivo abierto (UploadedFile) o una ruta
+        (str o Path); los dos primeros se vuelcan a disco aquí, antes de
+        volver, así que el llamador puede soltarlos en cuanto `submit`
+        termina.
+        Los archivos con un resultado anterior del mismo usuario (mismo
+        nombre) se regeneran de forma incremental. `options` se pasa a
+        `run_pipeline` (plantillas elegidas, un archivo por plantilla).
+        Con `portfolio` todos los proyectos van a un solo libro de cartera.
+        """
+        self.purge()
+        store = ResultStore(self.store_bytes)
+        files = [(name, Path(src) if isinstance(src, (str, os.PathLike)) else store.spool(name, src))
+                 for name, src in files]
+        with self._lock:
+            job_id = f"{next(self._ids):04d}"
+            previous = {name: p for name, _ in files
+                        if (p := self._latest_output(owner, name)) is not None}
+            job = Job(job_id, owner, [BatchItem(name, input_size(src)) for name, src in files],
+                      store)
+            self._jobs[job_id] = job
+        run = self._run_portfolio if portfolio else self._run
+        self._runner.submit(run, job, files, workers, executor or self.executor,
+                            metrics, options, previous)
+        return job_id
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def jobs(self, owner: str) -> list[Job]:
+        """Trabajos del usuario, del más reciente al más antiguo."""
+        self.purge()
+        with self._lock:
+            return sorted((j for j in self._jobs.values() if j.owner == owner),
+                          key=lambda j: j.created, reverse=True)
+
+    def queue_position(self, owner: str) -> int | None:
+        """Puesto del siguiente archivo de `owner` en la cola de admisión (None = no espera)."""
+        return self.admission.position(owner) if self.admission is not None else None
+
+    def cancel(self, job_id: str) -> None:
+        job = self._jobs.get(job_id)
+        if job is not None and job.active:
+            job.cancel_event.set()
+
+    def forget(self, owner: str) -> None:
+        """Borra los trabajos terminados del usuario (y sus archivos)."""
+        with self._lock:
+            for job in [j for j in self._jobs.values() if j.owner == owner and not j.active]:
+                self._drop(job)
+
+    def purge(self) -> None:
+        """Borra los trabajos terminados hace más de `retention` segundos."""
+        now = time.time()
+        with self._lock:
+            for job in [j for j in self._jobs.values()
+                        if not j.active and now - (j.finished or now) > self.retention]:
+                self._drop(job)
+
+    def used(self, owner: str) -> int:
+        """Bytes en disco de los resultados de todos los trabajos de `owner`."""
+        with self._lock:
+            return sum(j.store.used for j in self._jobs.values() if j.owner == owner)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        for job in list(self._jobs.values()):
+            job.cancel_event.set()
+        self._runner.shutdown(wait=True)
+        with self._lock:
+            for job in list(self._jobs.values()):
+                self._drop(job)
+
+    # ─────────────────── interno ───────────────────────────────────
+    def _owner_room(self, job: Job, size: int, name: str) -> None:
+        """StoreFull si `size` bytes más no caben en el presupuesto del usuario."""
+        used = self.used(job.owner)
+        if used + size > self.owner_bytes:
+            raise StoreFull(f"{name}: {size / 2**20:.1f} MB no caben en tu espacio "
+                            f"({used / 2**20:.0f} de {self.owner_bytes / 2**20:.0f} MB usados); "
+                            f"borra los lotes terminados para liberarlo")
+
+    def _put(self, job: Job, name: str, data: bytes) -> str:
+        with self._disk_lock:
+            self._owner_room(job, len(data), name)
+            return job.store.put(name, data)
+
+    def _adopt(self, job: Job, name: str) -> str:
+        with self._disk_lock:
+            try:
+                self._owner_room(job, job.store.path(name).stat().st_size, name)
+            except StoreFull:
+                job.store.path(name).unlink(missing_ok=True)
+                raise
+            return job.store.adopt(name)
+
+    def _drop(self, job: Job) -> None:
+        self._jobs.pop(job.id, None)
+        job.store.close()
+
+    def _latest_output(self, owner: str, archivo: str) -> str | None:
+        for job in sorted(self._jobs.values(), key=lambda j: j.created, reverse=True):
+            if job.owner == owner and not job.active:
+                path = job.previous_for(archivo)
+                if path is not None:
+                    return path
+        return None
+
+    def _start(self, job: Job) -> bool:
+        """Marca el trabajo en marcha; False si se canceló mientras esperaba."""
+        if job.cancel_event.is_set():
+            for it in job.items:
+                it.status = CANCELLED
+            job.status, job.finished = CANCELLED, time.time()
+            job.store.drop_uploads()
+            return False
+        job.status, job.started = RUNNING, time.time()
+        return True
+
+    def _run(self, job: Job, files, workers, executor, metrics, options, previous) -> None:
+        if not self._start(job):
+            return
+        # ZIP incremental en la carpeta del trabajo
+        bundle = ZipBundle(job.store.path(ZIP_NAME), level=self.zip_level) if len(files) > 1 else None
+
+        def on_update(items):
+            job.items = items
+            for i, it in enumerate(items):
+                if it.result is not None and i not in job.outputs:
+                    nombre = output_name(it.name, it.result[0])
+                    if bundle is not None:
+                        bundle.add(nombre, it.result[1])
+                    try:
+                        job.outputs[i] = self._put(job, nombre, it.result[1])
+                    except StoreFull as exc:
+                        job.warnings.append(str(exc))
+                    it.result = None            # ya está en disco: no retener los bytes
+
+        try:
+            run_batch(files, workers=workers, executor=executor, cache=self.cache,
+                      metrics=metrics, options=options, previous=previous,
+                      cancel=job.cancel_event, admission=self.admission, owner=job.owner,
+                      on_update=on_update)
+            if bundle is not None:
+                bundle.close()
+                if len(bundle) > 1:
+                    try:
+                        job.zip = self._adopt(job, ZIP_NAME)
+                    except StoreFull as exc:
+                        job.warnings.append(str(exc))
+                else:
+                    job.store.path(ZIP_NAME).unlink(missing_ok=True)
+            if job.cancel_event.is_set():
+                job.status = CANCELLED
+            elif any(it.status == FAILED for it in job.items) and not job.outputs:
+                job.status = FAILED
+            else:
+                job.status = DONE
+        except Exception as exc:                # p. ej. el pool de procesos se rompió
+            job.status, job.error = FAILED, f"{type(exc).__name__}: {exc}"
+        finally:
+            job.store.drop_uploads()
+            job.finished = time.time()
+
+    def _run_portfolio(self, job: Job, files, workers, executor, metrics, options,
+                       previous) -> None:
+        """Lee los marcos en el pool y arma un solo libro con todos los proyectos."""
+        if not self._start(job):
+            return
+        options = options or {}
+
+        def on_update(items):
+            job.items = items
+
+        try:
+            items = run_batch(files, workers=workers, executor=executor,
+                              options={"templates": options.get("templates")},
+                              cancel=job.cancel_event, task=timed_load,
+                              admission=self.admission, owner=job.owner, on_update=on_update)
+            if job.cancel_event.is_set():
+                job.status = CANCELLED
+                return
+            projects = [(it.name, it.result) for it in items if it.status == DONE]
+            if not projects:
+                job.status = FAILED
+                return
+            data = build_portfolio(projects, templates=options.get("templates"),
+                                   failed={it.name: it.error for it in items if it.status == FAILED},
+                                   compression=options.get("compression", DEFAULT_COMPRESSION))
+            for it in items:
+                it.result = None                # los marcos ya están en el libro
+            try:
+                job.portfolio = self._put(job, PORTFOLIO_NAME, data)
+                job.status = DONE
+            except StoreFull as exc:
+                job.warnings.append(str(exc))
+                job.status = FAILED
+        except Exception as exc:
+            job.status, job.error = FAILED, f"{type(exc).__name__}: {exc}"
+        finally:
+            job.store.drop_uploads()
+            job.finished = time.time()
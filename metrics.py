@@ -0,0 +1,67 @@
+# metrics.py
+"""
+Métricas por etapa de `run_pipeline`: tiempos, filas leídas, celdas
+escritas y tamaños de entrada/salida.
+
+    m = []
+    run_pipeline(data, on_metrics=m.append)
+    m[0].as_dict()      # → JSON serializable
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+
+@dataclass
+class StageMetric:
+    name: str
+    seconds: float
+    cells: int | None = None                    # celdas escritas (solo builders)
+
+
+@dataclass
+class PipelineMetrics:
+    input_bytes: int = 0
+    output_bytes: int = 0
+    rows: dict[str, int] = field(default_factory=dict)     # filas por hoja de entrada
+    stages: list[StageMetric] = field(default_factory=list)
+    reused: list[str] = field(default_factory=list)        # plantillas copiadas del resultado previo
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(s.seconds for s in self.stages)
+
+    @property
+    def cells(self) -> int:
+        return sum(s.cells or 0 for s in self.stages)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Cronometra el bloque; lo que se asigne a `.cells` queda registrado."""
+        m = StageMetric(name, 0.0)
+        t0 = time.perf_counter()
+        try:
+            yield m
+        finally:
+            m.seconds = time.perf_counter() - t0
+            self.stages.append(m)
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "total_seconds": self.total_seconds, "cells": self.cells}
+
+
+def written_cells(ws) -> int:
+    """
+    Celdas materializadas en la hoja (valor o estilo).
+
+    openpyxl no expone un contador público: se lee `ws._cells` solo con la
+    serie fijada en requirements.txt (la misma que exige styles.py); con
+    otra versión se cuenta el rectángulo usado de la hoja.
+    """
+    from openpyxl import __version__
+
+    if __version__.startswith("3.1.") and isinstance(getattr(ws, "_cells", None), dict):
+        return len(ws._cells)
+    return ws.max_row * ws.max_column
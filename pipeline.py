@@ -1,28 +1,284 @@
 # pipeline.py
-import io, pandas as pd
+from __future__ import annotations
+
+import io, importlib.util, os
+from typing import TYPE_CHECKING, Callable
 from openpyxl import Workbook
+from framework import build_framework
+from incremental import Previous, assemble, open_previous, sheet_fingerprints, stamp
+from metrics import PipelineMetrics, written_cells
+from styles import register_styles
 from tables import (develop_chal_table, create_result_measure_table,
                     create_summary_next_steps_table, create_theory_of_change_table)
+from templates import render_plan
+from writer import DEFAULT as DEFAULT_COMPRESSION, resolve_levels, save_workbook
+
+if TYPE_CHECKING:                       # pandas se importa en read_inputs (arranque rápido)
+    from concurrent.futures import Executor
+    import pandas as pd
+
+# Subir cuando cambie el contenido/formato de las plantillas generadas
+# (invalida la caché de resultados, ver cache.py).
+TEMPLATE_VERSION = "1"
+
+SHEET_RESULTS   = "SDO & Result Indicators"
+SHEET_SOLUTIONS = "Solutions & Outputs"
+INPUT_COLUMNS   = ("Element type", "Number", "Name", "ID")   # únicas columnas que usan los builders
+
+# calamine (Rust) es varias veces más rápido que openpyxl leyendo .xlsx;
+# se usa solo si `python-calamine` está instalado.
+READER_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+
+# plantilla → builder, en el orden de las hojas del resultado
+BUILDERS = {
+    "C": develop_chal_table,
+    "E": create_result_measure_table,
+    "F": create_summary_next_steps_table,
+    "D": create_theory_of_change_table,
+}
+TEMPLATE_KEYS = tuple(BUILDERS)
+
+# motores de salida: objetos de celda de openpyxl (tables.py) o XML directo
+# por filas (sheetml.py); el contenido de las hojas es equivalente
+ENGINES = ("openpyxl", "sheetml")
+
+# hojas de entrada que necesita cada plantilla (solo D usa los componentes)
+TEMPLATE_INPUTS = {
+    "C": (SHEET_RESULTS,),
+    "E": (SHEET_RESULTS,),
+    "F": (SHEET_RESULTS,),
+    "D": (SHEET_RESULTS, SHEET_SOLUTIONS),
+}
+
+
+def select_templates(templates=None) -> tuple[str, ...]:
+    """Normaliza la selección ("C,D", ["d", "C"], None = todas) al orden de BUILDERS."""
+    if templates is None:
+        return TEMPLATE_KEYS
+    if isinstance(templates, str):
+        templates = templates.split(",")
+    wanted = {t.strip().upper() for t in templates if t.strip()}
+    unknown = wanted - set(BUILDERS)
+    if unknown:
+        raise ValueError(f"plantillas desconocidas: {', '.join(sorted(unknown))} "
+                         f"(válidas: {', '.join(TEMPLATE_KEYS)})")
+    if not wanted:
+        raise ValueError("hay que elegir al menos una plantilla")
+    return tuple(k for k in TEMPLATE_KEYS if k in wanted)
+
+
+def input_size(excel_file: bytes | str | os.PathLike) -> int:
+    """Bytes de la entrada, ya sea el contenido o la ruta de un .xlsx."""
+    if isinstance(excel_file, (bytes, bytearray)):
+        return len(excel_file)
+    return os.path.getsize(excel_file)
+
 
-def run_pipeline(excel_file: bytes) -> tuple[str, bytes]:
+def read_inputs(excel_file: bytes | str | os.PathLike,
+                sheets: tuple[str, ...] = (SHEET_RESULTS, SHEET_SOLUTIONS),
+                engine: str | None = None) -> dict[str, pd.DataFrame]:
     """
-    Recibe el contenido binario de un .xlsx,
-    devuelve (nombre_archivo_resultado, contenido en bytes).
+    Abre el libro una sola vez y devuelve {hoja: DataFrame} solo con las
+    columnas de INPUT_COLUMNS (el resto de columnas y hojas se ignora).
+
+    Con una ruta, calamine/openpyxl leen del archivo en disco solo las
+    partes que necesitan, sin cargar el .xlsx entero en memoria.
     """
-    # 1. Leer hojas en DataFrames --------------------------
-    input_buffer = io.BytesIO(excel_file)
-    df  = pd.read_excel(input_buffer, sheet_name="SDO & Result Indicators")
-    df2 = pd.read_excel(input_buffer, sheet_name="Solutions & Outputs")
+    import pandas as pd
+
+    source = io.BytesIO(excel_file) if isinstance(excel_file, (bytes, bytearray)) else excel_file
+    with pd.ExcelFile(source, engine=engine or READER_ENGINE) as xls:
+        return {s: xls.parse(s, usecols=lambda c: c in INPUT_COLUMNS) for s in sheets}
+
 
-    # 2. Generar workbook ----------------------------------
+def _code_version() -> str:
+    from cache import code_version      # import diferido: cache importa pipeline
+    return code_version()
+
+
+def _build(fw, fingerprints: dict[str, str], m: PipelineMetrics, reuse=frozenset(),
+           compression=DEFAULT_COMPRESSION) -> bytes:
+    """Genera el libro con las plantillas de `fingerprints`; las de `reuse` quedan vacías."""
     wb = Workbook()
-    develop_chal_table(wb, data=df)
-    create_result_measure_table(wb, data=df)
-    create_summary_next_steps_table(wb, data=df)
-    create_theory_of_change_table(wb, results_df=df, components_df=df2)
-
-    # 3. Guardar en memoria y devolver ---------------------
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-    return "resultado.xlsx", output.read()
+    register_styles(wb)
+    for key in fingerprints:
+        if key in reuse:
+            wb.create_sheet(render_plan(key).title)
+            continue
+        builder = BUILDERS[key]
+        with m.stage(builder.__name__) as stage:
+            stage.cells = written_cells(builder(wb, framework=fw))
+    stamp(wb, fingerprints)
+    with m.stage("save"):
+        return save_workbook(wb, compression)
+
+
+def render_sheet(fw, key: str, fingerprint: str) -> tuple[bytes, int]:
+    """
+    Una sola plantilla en su propio libro, sin comprimir, y las celdas
+    escritas: la unidad de trabajo del modo paralelo (corre en otro proceso).
+    """
+    wb = Workbook()
+    register_styles(wb)
+    cells = written_cells(BUILDERS[key](wb, framework=fw))
+    stamp(wb, {key: fingerprint})
+    return save_workbook(wb, 0), cells
+
+
+def _render_parallel(fw, fingerprints: dict[str, str], m: PipelineMetrics,
+                     executor: Executor | None, workers: int) -> dict[str, Previous]:
+    """Renderiza cada plantilla en un proceso: {plantilla: paquete con su hoja}.
+
+    Sin `executor` se crea un pool ('spawn') de `workers` procesos solo
+    para este archivo y se cierra al terminar.
+    """
+    if executor is None:
+        import multiprocessing as mp
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn")) as pool:
+            return _render_parallel(fw, fingerprints, m, pool, workers)
+    # D (teoría de cambio) suele ser la más pesada: se encola primero
+    order = sorted(fingerprints, key=lambda k: k != "D")
+    with m.stage("render_parallel") as stage:
+        futures = {key: executor.submit(render_sheet, fw, key, fingerprints[key]) for key in order}
+        rendered, stage.cells = {}, 0
+        for key, fut in futures.items():
+            package, cells = fut.result()
+            rendered[key] = Previous(package)
+            stage.cells += cells
+    return rendered
+
+
+def _render_sheetml(fw, fingerprints: dict[str, str], m: PipelineMetrics) -> dict[str, bytes]:
+    """Motor sheetml: {plantilla: XML de su hoja}, sin objetos de celda."""
+    import sheetml
+
+    rendered = {}
+    for key in fingerprints:
+        with m.stage(f"sheetml_{key}") as stage:
+            rendered[key], stage.cells = sheetml.render(key, fw)
+    return rendered
+
+
+def _assemble(fw, fingerprints: dict[str, str], m: PipelineMetrics, sources: dict,
+              compression=DEFAULT_COMPRESSION) -> bytes | None:
+    """
+    Libro con las hojas de `sources` ({plantilla: paquete o XML}) puestas
+    en su sitio; las demás se construyen con openpyxl. None si los estilos
+    de algún paquete no coinciden.
+    """
+    # las hojas de `sources` quedan vacías y se guarda sin comprimir:
+    # assemble las pone en su sitio y comprime al reescribir
+    result = _build(fw, fingerprints, m, set(sources), 0 if sources else compression)
+    if not sources:
+        return result
+    with m.stage("splice"):
+        return assemble(result, {render_plan(k).title: src for k, src in sources.items()},
+                        compression)
+
+
+def _split(fw, fingerprints: dict[str, str], m: PipelineMetrics, on_metrics,
+           compression=DEFAULT_COMPRESSION, engine: str = "openpyxl") -> bytes:
+    """ZIP con un .xlsx por plantilla (resultado_C.xlsx, resultado_D.xlsx, …)."""
+    from bundle import ZipBundle
+
+    with ZipBundle() as bundle:
+        for key, fp in fingerprints.items():
+            sources = _render_sheetml(fw, {key: fp}, m) if engine == "sheetml" else {}
+            bundle.add(f"resultado_{key}.xlsx", _assemble(fw, {key: fp}, m, sources, compression))
+    data = bundle.getvalue()
+    m.output_bytes = len(data)
+    if on_metrics is not None:
+        on_metrics(m)
+    return data
+
+
+def run_pipeline(excel_file: bytes | str | os.PathLike, *, templates=None, split: bool = False, previous=None,
+                 compression=DEFAULT_COMPRESSION, sheet_workers: int = 1,
+                 executor: Executor | None = None, engine: str = "openpyxl",
+                 on_metrics: Callable[[PipelineMetrics], None] | None = None) -> tuple[str, bytes]:
+    """
+    Recibe el contenido binario de un .xlsx (o su ruta, p. ej. la subida
+    ya volcada a disco: se lee sin copiarla entera en memoria),
+    devuelve (nombre_archivo_resultado, contenido en bytes).
+
+    templates : str | iterable, optional
+        Plantillas a generar ("C", "E", "F", "D"; por defecto todas). Las
+        no elegidas no se construyen, y "Solutions & Outputs" solo se lee
+        si se pide D.
+    split : bool
+        Un .xlsx por plantilla, devueltos juntos en un ZIP.
+    previous : bytes | path, optional
+        Resultado anterior del mismo proyecto: las hojas cuyos datos no
+        cambiaron se copian de él en lugar de reconstruirse (incremental.py).
+    compression : str | int
+        "fast", "balanced" (por defecto), "smallest" o un nivel 0-9; las
+        partes del .xlsx se comprimen en paralelo (writer.py).
+    sheet_workers : int
+        Con más de 1, cada plantilla se renderiza en un proceso aparte (en
+        su propio libro) y las hojas se ensamblan en un solo .xlsx con la
+        tabla de estilos común, como las reutilizadas. El contenido es el
+        mismo que en secuencial; sirve para un solo proyecto muy grande.
+    executor : Executor, optional
+        Pool de procesos para ese modo (por defecto uno de `sheet_workers`,
+        creado para este archivo y cerrado al terminar).
+    engine : str
+        "openpyxl" (por defecto, builders de tables.py) o "sheetml": el XML
+        de cada hoja se escribe por filas sin crear objetos de celda
+        (sheetml.py), mucho más rápido y con menos memoria en marcos
+        grandes. Las hojas son equivalentes (mismos valores, estilos,
+        combinaciones y validaciones). Con "sheetml" no se usa
+        `sheet_workers`.
+    on_metrics : callable, optional
+        Recibe un `PipelineMetrics` (tiempos por etapa, filas, celdas,
+        tamaños, hojas reutilizadas) al terminar.
+    """
+    selected = select_templates(templates)
+    resolve_levels(compression)         # opción inválida → ValueError antes de trabajar
+    if engine not in ENGINES:
+        raise ValueError(f"motor desconocido: {engine} (válidos: {', '.join(ENGINES)})")
+    m = PipelineMetrics(input_bytes=input_size(excel_file))
+
+    # 1. Leer hojas en DataFrames (una sola pasada) --------
+    sheets = tuple(dict.fromkeys(s for k in selected for s in TEMPLATE_INPUTS[k]))
+    with m.stage("read_inputs"):
+        frames = read_inputs(excel_file, sheets)
+    m.rows = {name: len(frame) for name, frame in frames.items()}
+
+    # 2. Marco de resultados (una vez, compartido) ---------
+    with m.stage("build_framework"):
+        fw = build_framework(frames[SHEET_RESULTS], frames.get(SHEET_SOLUTIONS))
+        every = sheet_fingerprints(fw, _code_version())
+        fingerprints = {k: every[k] for k in selected}
+
+    if split:                           # un libro por plantilla, sin reutilización
+        return "plantillas.zip", _split(fw, fingerprints, m, on_metrics, compression, engine)
+
+    # 3. Hojas reutilizables del resultado anterior --------
+    reuse, prev = set(), None
+    if previous is not None:
+        with m.stage("previous"):
+            prev = open_previous(previous)
+            if prev is not None:
+                reuse = prev.reusable(fingerprints, {k: render_plan(k).title for k in selected})
+
+    # 4. Hojas renderizadas aparte (sheetml o en paralelo) --
+    sources = dict.fromkeys(reuse, prev)            # plantilla → paquete (o XML) de su hoja
+    rest = {k: fp for k, fp in fingerprints.items() if k not in reuse}
+    if engine == "sheetml":
+        sources.update(_render_sheetml(fw, rest, m))
+    elif sheet_workers > 1 and len(rest) > 1:
+        sources.update(_render_parallel(fw, rest, m, executor, min(sheet_workers, len(rest))))
+
+    # 5. Generar workbook y guardar ------------------------
+    result = _assemble(fw, fingerprints, m, sources, compression)
+    if result is None:                  # estilos distintos: se construye todo aquí
+        reuse = set()
+        sources = _render_sheetml(fw, fingerprints, m) if engine == "sheetml" else {}
+        result = _assemble(fw, fingerprints, m, sources, compression)
+    m.reused = sorted(reuse)
+    m.output_bytes = len(result)
+    if on_metrics is not None:
+        on_metrics(m)
+    return "resultado.xlsx", result
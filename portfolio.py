@@ -0,0 +1,117 @@
+# portfolio.py
+"""
+Libro de cartera: todos los proyectos de un lote en un solo .xlsx.
+
+Cada proyecto aporta su grupo de hojas (P01 C. Desafío, P01 E. Medición,
+…, P02 C. Desafío, …) y una hoja "Índice" al principio resume la cartera
+con enlaces a cada hoja. Los marcos de resultados se leen en paralelo en
+el pool de procesos (batch.run_batch); las hojas se construyen en un solo
+libro, con los estilos registrados una vez, y se guarda una sola vez.
+
+    items = run_batch(files, task=timed_load, options={"templates": "C,D"})
+    data = build_portfolio([(it.name, it.result) for it in items if it.status == DONE])
+"""
+from __future__ import annotations
+
+import time
+
+from openpyxl import Workbook
+from openpyxl.worksheet.hyperlink import Hyperlink
+
+from framework import ResultsFramework, build_framework
+from pipeline import (SHEET_RESULTS, SHEET_SOLUTIONS, TEMPLATE_INPUTS, BUILDERS,
+                      read_inputs, select_templates)
+from styles import register_styles
+from templates import render_plan
+from writer import DEFAULT as DEFAULT_COMPRESSION, save_workbook
+
+PORTFOLIO_NAME = "bid_cartera.xlsx"
+INDEX_TITLE = "Índice"
+MAX_TITLE = 31                          # límite de Excel para el nombre de una pestaña
+
+
+def project_code(i: int) -> str:
+    """1 → 'P01' (prefijo de las hojas del proyecto)."""
+    return f"P{i:02d}"
+
+
+def sheet_title(code: str, template: str) -> str:
+    return f"{code} {render_plan(template).title}"[:MAX_TITLE]
+
+
+def load_framework(excel_file: bytes, templates=None) -> ResultsFramework:
+    """Lee solo las hojas que necesitan las plantillas elegidas y arma el marco."""
+    sheets = tuple(dict.fromkeys(s for k in select_templates(templates)
+                                 for s in TEMPLATE_INPUTS[k]))
+    frames = read_inputs(excel_file, sheets)
+    return build_framework(frames[SHEET_RESULTS], frames.get(SHEET_SOLUTIONS))
+
+
+def timed_load(content: bytes, metrics: bool = False, previous=None,
+               options: dict | None = None) -> tuple[ResultsFramework, float, None]:
+    """Tarea de run_batch (misma firma que batch._timed_run): devuelve el marco."""
+    t0 = time.perf_counter()
+    fw = load_framework(content, (options or {}).get("templates"))
+    return fw, time.perf_counter() - t0, None
+
+
+# ─────────────────── índice ────────────────────────────────────────
+_INDEX_COLUMNS = (("Código", 9), ("Archivo", 34), ("Objetivo General", 48),
+                  ("Objetivos", 11), ("Indicadores", 12), ("Componentes", 13))
+
+
+def _write_index(ws, projects: list[tuple[str, str, ResultsFramework]],
+                 selected: tuple[str, ...], failed: dict[str, str]) -> None:
+    ws.title = INDEX_TITLE
+    ncols = len(_INDEX_COLUMNS) + len(selected)
+    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=ncols)
+    ws.cell(1, 1, "Cartera de proyectos").style = "bid_title_left"
+    ws.cell(2, 1, f"{len(projects)} proyecto(s) · hojas: "
+                  f"{', '.join(render_plan(k).title for k in selected)}").style = "bid_note_left"
+
+    headers = [*_INDEX_COLUMNS, *((render_plan(k).title, 18) for k in selected)]
+    for col, (text, width) in enumerate(headers, 1):
+        ws.cell(4, col, text).style = "bid_hdr_navy_box"
+        ws.column_dimensions[ws.cell(4, col).column_letter].width = width
+
+    row = 5
+    for code, name, fw in projects:
+        values = (code, name, fw.general_objective or "", len(fw.objectives),
+                  fw.n_indicators, len(fw.solutions))
+        for col, value in enumerate(values, 1):
+            ws.cell(row, col, value).style = "bid_cell_left_top"
+        for col, key in enumerate(selected, len(values) + 1):
+            title = sheet_title(code, key)
+            cell = ws.cell(row, col, "Ir →")
+            cell.hyperlink = Hyperlink(ref=cell.coordinate, location=f"'{title}'!A1")
+            cell.style = "bid_cell_center"
+        row += 1
+
+    if failed:                          # archivos que no entraron en la cartera
+        row += 1
+        ws.cell(row, 1, "Archivos no incluidos").style = "bid_bold"
+        for name, error in failed.items():
+            row += 1
+            ws.cell(row, 2, name).style = "bid_cell_left_top"
+            ws.merge_cells(start_row=row, start_column=3, end_row=row, end_column=ncols)
+            ws.cell(row, 3, error).style = "bid_cell_left_top"
+    ws.freeze_panes = "A5"
+
+
+def build_portfolio(projects: list[tuple[str, ResultsFramework]], *, templates=None,
+                    failed: dict[str, str] | None = None,
+                    compression=DEFAULT_COMPRESSION) -> bytes:
+    """
+    [(nombre de archivo, marco)] → .xlsx de cartera (bytes).
+
+    `failed` ({archivo: error}) se lista al final del índice.
+    """
+    selected = select_templates(templates)
+    wb = Workbook()
+    register_styles(wb)
+    coded = [(project_code(i), name, fw) for i, (name, fw) in enumerate(projects, 1)]
+    for code, _, fw in coded:
+        for key in selected:
+            BUILDERS[key](wb, framework=fw, title=sheet_title(code, key))
+    _write_index(wb.active, coded, selected, failed or {})
+    return save_workbook(wb, compression)
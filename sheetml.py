@@ -0,0 +1,287 @@
+# sheetml.py
+"""
+Motor de salida directo: el XML de cada hoja (SpreadsheetML) se escribe
+fila a fila, sin pasar por el modelo de celdas de openpyxl.
+
+Con openpyxl cada celda que toca un builder es un objeto `Cell` con sus
+proxies de estilo, y el libro entero vive en memoria hasta `save`. Aquí
+cada plantilla se recorre en orden de filas: cada fila se serializa en
+cuanto está completa y solo se acumulan las combinaciones, las listas
+desplegables y los anchos (que van después de <sheetData>).
+
+    xml, cells = render("C", fw)        # bytes de xl/worksheets/sheetN.xml
+
+El resto del paquete (workbook.xml, styles.xml, propiedades) sigue
+saliendo de openpyxl con las hojas vacías, y pipeline.run_pipeline las
+sustituye por estas con incremental.assemble, igual que las reutilizadas.
+Los índices de estilo (atributo s) son los de styles.STYLE_IDS, que
+styles.register_styles reserva en todo libro de la app.
+
+El resultado es equivalente al de tables.py (mismos valores, estilos,
+combinaciones, anchos, altos y validaciones), no idéntico byte a byte:
+openpyxl guarda las combinaciones en un conjunto y su orden varía.
+Cualquier cambio en un builder de tables.py debe reflejarse aquí
+(tests/test_engines.py comprueba que ambos motores son equivalentes).
+"""
+import io
+from xml.sax.saxutils import escape
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.compat import safe_string
+from openpyxl.compat.numbers import NUMERIC_TYPES
+from openpyxl.utils import column_index_from_string, get_column_letter
+from openpyxl.utils.exceptions import IllegalCharacterError
+from openpyxl.worksheet.cell_range import CellRange
+
+from framework import ResultsFramework
+from styles import STYLE_IDS
+from templates import D_MATRIX_COL, D_MATRIX_WIDTH, RenderPlan, render_plan
+
+_HEADER = ('<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+           '<sheetPr><outlinePr summaryBelow="1" summaryRight="1"/><pageSetUpPr/></sheetPr>'
+           '<dimension ref="{ref}"/>'
+           '<sheetViews><sheetView workbookViewId="0">'
+           '<selection activeCell="A1" sqref="A1"/></sheetView></sheetViews>'
+           '<sheetFormatPr baseColWidth="8" defaultRowHeight="15"/>')
+_FOOTER = ('<pageMargins left="0.75" right="0.75" top="1" bottom="1" '
+           'header="0.5" footer="0.5"/></worksheet>')
+
+MAX_STRING = 32767                      # límite de Excel (openpyxl trunca igual)
+
+
+def _letters(n: int) -> list[str]:
+    return [""] + [get_column_letter(c) for c in range(1, n + 1)]
+
+
+# ─────────────────── celdas ────────────────────────────────────────
+def _cell(ref: str, value, s: str) -> str:
+    """<c> de una celda con el mismo tipo que le daría openpyxl."""
+    if value is None or value == "":
+        return f'<c r="{ref}"{s}/>'
+    if isinstance(value, bool):
+        return f'<c r="{ref}"{s} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, NUMERIC_TYPES):
+        return f'<c r="{ref}"{s} t="n"><v>{safe_string(value)}</v></c>'
+    if not isinstance(value, str):
+        raise ValueError(f"Cannot convert {value!r} to Excel")
+    value = value[:MAX_STRING]
+    if ILLEGAL_CHARACTERS_RE.search(value):
+        raise IllegalCharacterError(f"{value} cannot be used in worksheets.")
+    if value.startswith("=") and len(value) > 1:
+        return f'<c r="{ref}"{s}><f>{escape(value[1:])}</f><v/></c>'
+    stripped = value.strip()
+    space = ' xml:space="preserve"' if stripped and stripped != value else ""
+    return f'<c r="{ref}"{s} t="inlineStr"><is><t{space}>{escape(value)}</t></is></c>'
+
+
+# ─────────────────── escritor de una hoja ──────────────────────────
+class SheetWriter:
+    """
+    Escribe una hoja por filas, en orden creciente. La parte fija de la
+    plantilla (RenderPlan) se intercala sola: sus filas salen antes de la
+    primera fila de datos posterior, o mezcladas con la fila de datos del
+    mismo número (las celdas de datos mandan).
+    """
+
+    def __init__(self, plan: RenderPlan):
+        self._ids = STYLE_IDS
+        self._fixed: dict[int, dict[int, tuple]] = {}
+        for row, col, value, style in plan.cells:
+            self._fixed.setdefault(row, {})[col] = (value, style)
+        self._heights = dict(plan.heights)
+        self._widths = {column_index_from_string(col): w for col, w in plan.widths}
+        self._merges = list(plan.merges)
+        self._validations: list[tuple[str, str]] = []
+        self._data = io.BytesIO()
+        self._letters = _letters(64)
+        self._last_row = 0
+        self.max_row = self.max_col = 1
+        self.cells = 0
+
+    def width(self, col: int, width: float) -> None:
+        self._widths[col] = width
+
+    def merge(self, r1: int, c1: int, r2: int, c2: int) -> None:
+        self._merges.append((r1, c1, r2, c2))
+
+    def validation(self, formula: str, sqref: str) -> None:
+        self._validations.append((formula, sqref))
+
+    def row(self, r: int, cells: dict[int, tuple]) -> None:
+        """Fila `r`: {columna: (valor, estilo con nombre o None)}."""
+        if r <= self._last_row:
+            raise ValueError(f"fila {r} fuera de orden (la última fue {self._last_row})")
+        for fixed in sorted(k for k in self._fixed if k < r):
+            self._write(fixed, self._fixed.pop(fixed))
+        extra = self._fixed.pop(r, None)
+        self._write(r, {**extra, **cells} if extra else cells)
+
+    def getvalue(self) -> bytes:
+        """Cierra la hoja y devuelve el XML completo."""
+        for fixed in sorted(self._fixed):
+            self._write(fixed, self._fixed.pop(fixed))
+        for r1, c1, r2, c2 in self._merges:
+            self.max_row, self.max_col = max(self.max_row, r2), max(self.max_col, c2)
+        parts = [_HEADER.format(ref=f"A1:{get_column_letter(self.max_col)}{self.max_row}")]
+        if self._widths:
+            parts.append("<cols>")
+            parts.extend(f'<col width="{safe_string(w)}" customWidth="1" min="{c}" max="{c}"/>'
+                         for c, w in sorted(self._widths.items()))
+            parts.append("</cols>")
+        head = "".join(parts).encode()
+        parts = []
+        if self._merges:
+            parts.append(f'<mergeCells count="{len(self._merges)}">')
+            parts.extend(f'<mergeCell ref="{CellRange(min_row=r1, min_col=c1, max_row=r2, max_col=c2).coord}"/>'
+                         for r1, c1, r2, c2 in self._merges)
+            parts.append("</mergeCells>")
+        if self._validations:
+            parts.append(f'<dataValidations count="{len(self._validations)}">')
+            parts.extend(f'<dataValidation sqref="{sqref}" showDropDown="0" showInputMessage="0" '
+                         f'showErrorMessage="0" allowBlank="0" type="list">'
+                         f'<formula1>{escape(formula)}</formula1></dataValidation>'
+                         for formula, sqref in self._validations)
+            parts.append("</dataValidations>")
+        parts.append(_FOOTER)
+        rows = self._data.getvalue()
+        sheet_data = b"<sheetData>" + rows + b"</sheetData>" if rows else b"<sheetData/>"
+        return head + sheet_data + "".join(parts).encode()
+
+    def _write(self, r: int, cells: dict[int, tuple]) -> None:
+        if not cells:
+            return
+        height = self._heights.get(r)
+        attrs = f' ht="{safe_string(height)}" customHeight="1"' if height is not None else ""
+        parts = [f'<row r="{r}"{attrs}>']
+        cols = sorted(cells)
+        if cols[-1] >= len(self._letters):
+            self._letters = _letters(cols[-1] + 64)
+        for col in cols:
+            value, style = cells[col]
+            if value is None and style is None:
+                continue
+            s = f' s="{self._ids[style]}"' if style is not None else ""
+            parts.append(_cell(f"{self._letters[col]}{r}", value, s))
+            self.cells += 1
+        parts.append("</row>")
+        self._data.write("".join(parts).encode())
+        self._last_row = r
+        self.max_row, self.max_col = max(self.max_row, r), max(self.max_col, cols[-1])
+
+
+# ─────────────────── plantillas (espejo de tables.py) ──────────────
+def _develop_chal(w: SheetWriter, fw: ResultsFramework) -> None:
+    """C. Desafío: un bloque por Objetivo Específico desde la fila 5, luego GO."""
+    row = 5
+    for spec in fw.objectives:
+        indicators = spec.indicators or (None,)         # sin indicadores: una fila vacía
+        start, end = row, row + len(indicators) - 1
+        for col in (2, 3, 5, 6):                        # B, C, E, F combinadas
+            w.merge(start, col, end, col)
+        for i, ind in enumerate(indicators):
+            r = row + i
+            cells = {1: (None, "bid_cell"), 4: (ind, "bid_cell_top")}
+            if i:
+                cells.update({2: (None, "bid_cell"), 5: (None, "bid_cell"), 6: (None, "bid_cell")})
+            else:
+                cells.update({2: (None, "bid_cell_center"),
+                              3: (spec.name or f"[Objetivo Específico {spec.key}]",
+                                  "bid_cell_center"),
+                              5: (None, "bid_cell_center"), 6: (None, "bid_cell_center")})
+            if r == 5:
+                cells[1] = (fw.general_objective or "[Objetivo General]", "bid_cell_center")
+            w.row(r, cells)
+        row = end + 1
+    w.merge(5, 1, row - 1, 1)                           # Objetivo General
+    for r, txt in zip(range(row, row + 3), ["Indicador GO 1", "Indicador GO 2", "Indicador GO 3"]):
+        w.row(r, {col: (txt if col == 1 else None, "bid_go_row") for col in range(1, 7)})
+
+
+def _result_measure(w: SheetWriter, fw: ResultsFramework) -> None:
+    """E. Medición: A combinada por bloque, A-R con borde desde la fila 7."""
+    row = 7
+    for block in fw.objectives:
+        inds = block.indicators or (None,)              # sin indicadores: una fila vacía
+        end = row + len(inds) - 1
+        w.merge(row, 1, end, 1)
+        for i, ind in enumerate(inds):
+            cells = dict.fromkeys(range(1, 19), (None, "bid_cell_wrap_top"))
+            cells[2] = (ind, "bid_cell_wrap_top")
+            if not i:
+                cells[1] = (block.label, "bid_cell_wrap_top")
+            w.row(row + i, cells)
+        row = end + 1
+
+
+def _summary_next_steps(w: SheetWriter, fw: ResultsFramework) -> None:
+    """F. Resumen: como E (A-P) y listas desplegables sobre las filas de datos."""
+    row = 7
+    for bloc in fw.objectives:
+        inds = bloc.indicators or (None,)               # sin indicadores: una fila vacía
+        end = row + len(inds) - 1
+        w.merge(row, 1, end, 1)
+        for i, ind in enumerate(inds):
+            cells = dict.fromkeys(range(1, 17), (None, "bid_cell"))
+            cells[2] = (ind, "bid_cell")
+            if not i:
+                cells[1] = (bloc.label, "bid_cell_wrap_top")
+            w.row(row + i, cells)
+        row = end + 1
+    for formula, cols in render_plan("F").validations:
+        w.validation(formula, " ".join(f"{col}7:{col}{row - 1}" for col in cols))
+
+
+_BANNER_B = ("B. Teoría de Cambio\n"
+             "Para cada Objetivo Específico e Indicador marque:\n"
+             "1 – si el producto contribuye a su logro\n"
+             "2 – si el producto contribuye y es necesario para su logro")
+
+
+def _theory_of_change(w: SheetWriter, fw: ResultsFramework) -> None:
+    """D. Teoría de Cambio: Tabla A (A-O) y matriz de contribución desde R."""
+    start_col = D_MATRIX_COL
+    last_col = start_col + sum(1 + len(spec.indicators) for spec in fw.objectives) - 1
+    has_matrix = last_col >= start_col
+    first_letter, last_letter = get_column_letter(start_col), get_column_letter(last_col)
+
+    if has_matrix:
+        for c in range(start_col, last_col + 1):
+            w.width(c, D_MATRIX_WIDTH)
+        w.merge(4, start_col, 4, last_col)
+        w.row(4, {start_col: (_BANNER_B, "bid_banner_green_left")})
+        header, col = {}, start_col
+        for spec in fw.objectives:
+            header[col] = (spec.label, "bid_hdr_grey_left")
+            col += 1
+            for ind in spec.indicators:
+                header[col] = (ind, "bid_hdr_grey_left")
+                col += 1
+        w.row(5, header)
+        matrix = dict.fromkeys(range(start_col, last_col + 1), (None, "bid_cell_left"))
+    else:
+        matrix = {}
+
+    for row, (comp_name, comp_id) in enumerate(fw.solutions, 6):
+        cells = dict.fromkeys(range(3, 16), (None, "bid_cell"))
+        cells[1] = (comp_name, "bid_cell_left_top")
+        cells[2] = (comp_id, "bid_cell_left_top")
+        cells[12] = (f"=IF(SUM(G{row}:K{row})>0,1,0)", "bid_cell")
+        if has_matrix:
+            cells[14] = (f"=IF(MAX({first_letter}{row}:{last_letter}{row})=2,1,0)", "bid_cell")
+        cells.update(matrix)
+        w.row(row, cells)
+
+
+RENDERERS = {
+    "C": _develop_chal,
+    "E": _result_measure,
+    "F": _summary_next_steps,
+    "D": _theory_of_change,
+}
+
+
+def render(key: str, fw: ResultsFramework) -> tuple[bytes, int]:
+    """XML de la hoja de la plantilla `key` y las celdas escritas."""
+    writer = SheetWriter(render_plan(key))
+    RENDERERS[key](writer, fw)
+    return writer.getvalue(), writer.cells
@@ -0,0 +1,122 @@
+# store.py
+"""
+Resultados de un lote guardados en disco en lugar de en memoria.
+
+Cada lote (jobs.Job) tiene su propia carpeta temporal con un presupuesto
+de bytes; los botones de descarga leen el archivo solo cuando se pulsan,
+así que la memoria residente no crece con el tamaño del lote. La carpeta
+se borra al reiniciar, cuando el lote caduca (el objeto deja de estar
+referenciado) o al salir el proceso.
+
+Las entradas del lote también se vuelcan aquí (`spool`), una sola vez y
+por bloques, para que el pipeline las lea desde la ruta en lugar de
+arrastrar copias en bytes por la cola, el pool y los lectores.
+"""
+import itertools, shutil, tempfile, time, weakref
+from pathlib import Path
+
+PREFIX = "bid-session-"
+UPLOADS = "entrada"                     # subcarpeta de las entradas volcadas
+SPOOL_CHUNK = 1 * 2**20
+
+
+class StoreFull(RuntimeError):
+    """El resultado no cabe en el presupuesto del lote."""
+
+
+class ResultStore:
+    """
+    Parameters
+    ----------
+    max_bytes : int
+        Presupuesto de disco del lote.
+    root : str | Path, optional
+        Carpeta padre (por defecto el temporal del sistema).
+    """
+
+    def __init__(self, max_bytes: int = 512 * 2**20, root=None):
+        self.max_bytes = max_bytes
+        self.dir = Path(tempfile.mkdtemp(prefix=PREFIX, dir=root))
+        self.files: dict[str, int] = {}         # nombre → bytes, en orden de llegada
+        self._spooled = itertools.count(1)
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.dir, ignore_errors=True)
+
+    @property
+    def used(self) -> int:
+        return sum(self.files.values())
+
+    def path(self, name: str) -> Path:
+        return self.dir / Path(name).name       # sin rutas: solo el nombre
+
+    def _unique(self, name: str) -> str:
+        p, n = Path(name), 2
+        while p.name in self.files:
+            p, n = Path(f"{Path(name).stem} ({n}){Path(name).suffix}"), n + 1
+        return p.name
+
+    def put(self, name: str, data: bytes) -> str:
+        """Guarda `data` y devuelve el nombre final (sin duplicados); StoreFull si no cabe."""
+        if self.used + len(data) > self.max_bytes:
+            raise StoreFull(f"{name}: {len(data) / 2**20:.1f} MB no caben en el espacio "
+                            f"del lote ({self.max_bytes / 2**20:.0f} MB)")
+        name = self._unique(name)
+        self.path(name).write_bytes(data)
+        self.files[name] = len(data)
+        return name
+
+    def adopt(self, name: str) -> str:
+        """Registra un archivo escrito directamente en `path(name)` (p. ej. el ZIP)."""
+        size = self.path(name).stat().st_size
+        if self.used - self.files.get(name, 0) + size > self.max_bytes:
+            self.path(name).unlink(missing_ok=True)
+            raise StoreFull(f"{name}: {size / 2**20:.1f} MB no caben en el espacio del lote")
+        self.files[name] = size
+        return name
+
+    def spool(self, name: str, src) -> Path:
+        """
+        Vuelca una entrada (bytes o archivo abierto, p. ej. el UploadedFile
+        de Streamlit) a `entrada/` y devuelve su ruta. Las entradas no
+        cuentan en el presupuesto de resultados; ver `drop_uploads`.
+        """
+        folder = self.dir / UPLOADS
+        folder.mkdir(exist_ok=True)
+        path = folder / f"{next(self._spooled):03d}_{Path(name).name}"
+        with open(path, "wb") as out:
+            if isinstance(src, (bytes, bytearray)):
+                out.write(src)
+            else:
+                src.seek(0)
+                shutil.copyfileobj(src, out, SPOOL_CHUNK)
+        return path
+
+    def drop_uploads(self) -> None:
+        """Borra las entradas volcadas (cuando el lote ya no las necesita)."""
+        shutil.rmtree(self.dir / UPLOADS, ignore_errors=True)
+
+    def reader(self, name: str):
+        """Función sin argumentos que lee el archivo (para `data=` diferido)."""
+        path = self.path(name)
+        return path.read_bytes
+
+    def clear(self) -> None:
+        for name in self.files:
+            self.path(name).unlink(missing_ok=True)
+        self.files.clear()
+
+    def close(self) -> None:
+        self.files.clear()
+        self._finalizer()
+
+
+def sweep_stale(max_age: float, root=None) -> int:
+    """Borra carpetas huérfanas (p. ej. tras un reinicio brusco)."""
+    base, now, removed = Path(root or tempfile.gettempdir()), time.time(), 0
+    for d in base.glob(f"{PREFIX}*"):
+        try:
+            if d.is_dir() and now - d.stat().st_mtime > max_age:
+                shutil.rmtree(d, ignore_errors=True)
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
@@ -0,0 +1,137 @@
+# styles.py
+"""
+Registro único de estilos BID.
+
+Aquí se define la paleta corporativa y, a partir de ella, los estilos con
+nombre (NamedStyle) que usan las cuatro hojas. Los builders aplican cada
+estilo por referencia (`cell.style = "bid_…"`) en lugar de crear Font /
+Alignment / Border / PatternFill por celda: menos objetos por celda, menos
+deduplicación al guardar y una tabla de estilos más pequeña.
+"""
+from functools import lru_cache
+
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.fonts import DEFAULT_FONT
+
+# ─────────────────── Paleta corporativa ────────────────────────────
+NAVY   = "004B6B"   # encabezados C
+BLUE   = "196E8C"   # encabezados azules D-F
+GREEN  = "308144"   # banners
+LGREEN = "ACCDB4"   # encabezados a completar (verde claro)
+GREY   = "E7E6E6"   # gris claro
+DGREY  = "A6A6A6"   # gris oscuro (columnas calculadas)
+SILVER = "BFBFBF"   # bloque Indicadores GO
+CYAN   = "00B0F0"   # supuestos
+CREME  = "F2F2CB"   # explicaciones
+WHITE  = "FFFFFF"
+
+# ─────────────────── Piezas base ───────────────────────────────────
+F_TITLE = Font(bold=True, size=14)
+F_NOTE  = Font(italic=True, size=11)
+F_BOLD  = Font(bold=True)
+F_WHITE = Font(bold=True, color=WHITE)
+
+A_CENTER   = Alignment(horizontal="center", vertical="center", wrap_text=True)
+A_LEFT     = Alignment(horizontal="left", vertical="center", wrap_text=True)
+A_LEFT_TOP = Alignment(horizontal="left", vertical="top", wrap_text=True)
+A_TOP      = Alignment(vertical="top", wrap_text=True)
+A_TOP_RAW  = Alignment(vertical="top")
+A_ROTATED  = Alignment(horizontal="center", vertical="center", wrap_text=True, text_rotation=90)
+
+THIN = Border(*(Side(style="thin"),) * 4)
+
+
+def _fill(color: str) -> PatternFill:
+    return PatternFill("solid", fgColor=color)
+
+
+# ─────────────────── Estilos con nombre ────────────────────────────
+# nombre → piezas; el orden es el de registro en el libro (estable).
+STYLES: dict[str, dict] = {
+    # títulos y notas (filas 1-3)
+    "bid_title":         dict(font=F_TITLE),
+    "bid_note":          dict(font=F_NOTE),
+    "bid_bold":          dict(font=F_BOLD),
+    "bid_title_left":    dict(font=F_TITLE, alignment=A_LEFT),
+    "bid_note_left":     dict(font=F_NOTE, alignment=A_LEFT),
+    # encabezados centrados
+    "bid_hdr_navy_box":  dict(font=F_WHITE, fill=_fill(NAVY), alignment=A_CENTER, border=THIN),
+    "bid_hdr_cyan_box":  dict(font=F_WHITE, fill=_fill(CYAN), alignment=A_CENTER, border=THIN),
+    "bid_hdr_blue":      dict(font=F_WHITE, fill=_fill(BLUE), alignment=A_CENTER),
+    "bid_hdr_grey":      dict(font=F_BOLD, fill=_fill(GREY), alignment=A_CENTER),
+    "bid_hdr_lgreen":    dict(font=F_BOLD, fill=_fill(LGREEN), alignment=A_CENTER),
+    "bid_hdr_white":     dict(font=F_BOLD, fill=_fill(WHITE), alignment=A_CENTER),
+    "bid_fill_white":    dict(fill=_fill(WHITE)),
+    "bid_banner_green":  dict(font=F_WHITE, fill=_fill(GREEN), alignment=A_CENTER),
+    "bid_banner_green_dark": dict(font=F_BOLD, fill=_fill(GREEN), alignment=A_CENTER),
+    # encabezados alineados a la izquierda / rotados (Teoría de Cambio)
+    "bid_banner_green_left": dict(font=F_WHITE, fill=_fill(GREEN), alignment=A_LEFT),
+    "bid_hdr_blue_left":   dict(font=F_WHITE, fill=_fill(BLUE), alignment=A_LEFT),
+    "bid_hdr_blue_rot":    dict(font=F_WHITE, fill=_fill(BLUE), alignment=A_ROTATED),
+    "bid_hdr_dgrey_rot":   dict(font=F_BOLD, fill=_fill(DGREY), alignment=A_ROTATED),
+    "bid_hdr_dgrey_left":  dict(font=F_BOLD, fill=_fill(DGREY), alignment=A_LEFT),
+    "bid_hdr_lgreen_left": dict(font=F_BOLD, fill=_fill(LGREEN), alignment=A_LEFT),
+    "bid_hdr_creme_left":  dict(font=F_BOLD, fill=_fill(CREME), alignment=A_LEFT),
+    "bid_hdr_cyan_left":   dict(font=F_BOLD, fill=_fill(CYAN), alignment=A_LEFT),
+    "bid_hdr_grey_left":   dict(font=F_BOLD, fill=_fill(GREY), alignment=A_LEFT),
+    # celdas de datos
+    "bid_cell":          dict(border=THIN),
+    "bid_cell_center":   dict(alignment=A_CENTER, border=THIN),
+    "bid_cell_top":      dict(alignment=A_TOP_RAW, border=THIN),
+    "bid_cell_wrap_top": dict(alignment=A_TOP, border=THIN),
+    "bid_cell_left":     dict(alignment=A_LEFT, border=THIN),
+    "bid_cell_left_top": dict(alignment=A_LEFT_TOP, border=THIN),
+    "bid_go_row":        dict(fill=_fill(SILVER), border=THIN),
+}
+
+
+# índice de cellXfs (atributo s= de cada celda) que reserva register_styles:
+# 0 es el formato por defecto del libro y después va STYLES en orden
+STYLE_IDS: dict[str, int] = {name: i for i, name in enumerate(STYLES, 1)}
+
+
+def register_styles(wb) -> None:
+    """
+    Añade al libro los estilos de STYLES que aún no tenga (idempotente).
+
+    Además reserva un formato de celda por estilo, en el orden de STYLES
+    (STYLE_IDS): así styles.xml (y el índice `s=` de cada celda) es el
+    mismo en todos los libros, sea cual sea el orden en que se escriban las
+    hojas. La regeneración incremental y el ensamblado de hojas
+    (incremental.py) y el motor sheetml.py dependen de ello; si openpyxl
+    deja de asignar esos índices se lanza RuntimeError en lugar de generar
+    libros con los estilos cambiados.
+    """
+    _reserve(wb)
+    _check_style_ids()
+
+
+def _reserve(wb) -> None:
+    present = set(wb.named_styles)
+    for name, parts in STYLES.items():
+        if name not in present:
+            # lo que no se indica hereda los valores por defecto del libro
+            parts = {"font": DEFAULT_FONT, "border": DEFAULT_BORDER, **parts}
+            style = NamedStyle(name=name, **parts)
+            wb.add_named_style(style)
+            # openpyxl no tiene API pública para esto
+            if wb._cell_styles.add(style.as_tuple()) != STYLE_IDS[name]:
+                raise RuntimeError(f"el estilo {name} no quedó en el formato de celda "
+                                   f"{STYLE_IDS[name]} (¿libro con otros estilos previos?)")
+
+
+@lru_cache(maxsize=1)
+def _check_style_ids() -> None:
+    """Una vez por proceso: `cell.style = nombre` debe dar el índice reservado."""
+    from openpyxl import Workbook, __version__
+
+    wb = Workbook()
+    _reserve(wb)
+    cell = wb.active.cell(1, 1)
+    for name, expected in STYLE_IDS.items():
+        cell.style = name
+        if cell.style_id != expected:
+            raise RuntimeError(f"openpyxl {__version__} asigna a {name} el formato de celda "
+                               f"{cell.style_id}, no el {expected} reservado: styles.py necesita "
+                               f"una versión compatible (ver requirements.txt)")
@@ -0,0 +1,101 @@
+# synthetic.py
+"""
+Generador de libros de proyecto sintéticos con las hojas
+"SDO & Result Indicators" y "Solutions & Outputs", de tamaño configurable.
+
+Sirve para benchmarks, pruebas de carga y para calentar el pipeline sin
+depender de archivos reales:
+
+    from synthetic import make_workbook, SIZES
+    data = make_workbook(**SIZES["large"])
+"""
+import io, random
+from openpyxl import Workbook
+
+from pipeline import SHEET_RESULTS, SHEET_SOLUTIONS
+
+# tamaños de referencia (objetivos × indicadores, componentes × productos)
+SIZES: dict[str, dict] = {
+    "tiny":   dict(n_objectives=1,  indicators_per_objective=1,  n_solutions=1,
+                   outputs_per_solution=1, extra_columns=0,  extra_rows=0),
+    "small":  dict(n_objectives=3,  indicators_per_objective=3,  n_solutions=4,
+                   outputs_per_solution=3, extra_columns=10, extra_rows=50),
+    "medium": dict(n_objectives=10, indicators_per_objective=6,  n_solutions=12,
+                   outputs_per_solution=5, extra_columns=20, extra_rows=500),
+    "large":  dict(n_objectives=40, indicators_per_objective=12, n_solutions=40,
+                   outputs_per_solution=8, extra_columns=30, extra_rows=5000),
+}
+
+# columnas que traen los libros reales y que el pipeline no usa
+_EXTRA_HEADERS = ["Unit of measure", "Baseline", "Baseline year", "Target", "Target year",
+                  "Means of verification", "Comments", "Disaggregation", "Frequency",
+                  "Responsible", "Status", "Last update"]
+
+_WORDS = ("access coverage quality households women youth rural urban schools clinics "
+          "water energy roads digital services income employment training firms credit "
+          "resilience climate health learning connectivity productivity").split()
+
+
+def _phrase(rnd: random.Random, n: int = 6) -> str:
+    return " ".join(rnd.choice(_WORDS) for _ in range(n)).capitalize()
+
+
+def _segment(i: int) -> str:
+    """1 → A, 26 → Z, 27 → 27 (como las numeraciones reales, que pasan a números)."""
+    return chr(64 + i) if i <= 26 else str(i)
+
+
+def make_workbook(n_objectives: int = 3, indicators_per_objective: int = 3,
+                  n_solutions: int = 4, outputs_per_solution: int = 3, *,
+                  extra_columns: int = 10, extra_rows: int = 50, seed: int = 0) -> bytes:
+    """
+    Devuelve el contenido .xlsx de un libro de proyecto sintético.
+
+    Parameters
+    ----------
+    n_objectives, indicators_per_objective : int
+        Objetivos Específicos (1.1, 1.2, …) e Indicadores por objetivo (1.1.A, …).
+    n_solutions, outputs_per_solution : int
+        Componentes 'Solution' y productos 'Output' por componente.
+    extra_columns : int
+        Columnas adicionales (no usadas por el pipeline) en ambas hojas.
+    extra_rows : int
+        Filas de una hoja extra "Budget" que el pipeline debe ignorar.
+    seed : int
+        Semilla: mismos parámetros → mismo libro.
+    """
+    rnd = random.Random(seed)
+    extra = [_EXTRA_HEADERS[i % len(_EXTRA_HEADERS)] + (f" {i // len(_EXTRA_HEADERS) + 1}"
+             if i >= len(_EXTRA_HEADERS) else "") for i in range(extra_columns)]
+
+    def filler():
+        return [rnd.choice((round(rnd.random() * 100, 2), _phrase(rnd, 3), 2020 + rnd.randint(0, 9)))
+                for _ in extra]
+
+    wb = Workbook(write_only=True)
+
+    ws = wb.create_sheet(SHEET_RESULTS)
+    ws.append(["Element type", "Number", "Name", "ID", *extra])
+    ws.append(["General Objective", "1", f"Improve {_phrase(rnd)}", "GO-1", *filler()])
+    for o in range(1, n_objectives + 1):
+        ws.append(["Specific Objective", f"1.{o}", f"Increase {_phrase(rnd)}", f"SO-{o}", *filler()])
+        for i in range(1, indicators_per_objective + 1):
+            ws.append(["Result indicator", f"1.{o}.{_segment(i)}",
+                       f"% of {_phrase(rnd, 4)}", f"RI-{o}-{i}", *filler()])
+
+    ws = wb.create_sheet(SHEET_SOLUTIONS)
+    ws.append(["Element type", "Number", "Name", "ID", *extra])
+    for s in range(1, n_solutions + 1):
+        ws.append(["Solution", f"{s}", f"Component {s}: {_phrase(rnd, 4)}", f"C{s}", *filler()])
+        for p in range(1, outputs_per_solution + 1):
+            ws.append(["Output", f"{s}.{p}", f"{_phrase(rnd, 5)} delivered", f"C{s}.P{p}", *filler()])
+
+    if extra_rows:
+        ws = wb.create_sheet("Budget")
+        ws.append(["Line", "Description", "Amount", "Year"])
+        for r in range(extra_rows):
+            ws.append([r + 1, _phrase(rnd, 4), round(rnd.random() * 1e6, 2), 2020 + r % 10])
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
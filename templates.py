@@ -0,0 +1,245 @@
+# templates.py
+"""
+Parte fija de cada plantilla (títulos, banners, encabezados, anchos,
+listas desplegables) descrita como datos.
+
+Cada TemplateSpec se compila una vez por proceso (`render_plan`) en un
+RenderPlan con coordenadas ya resueltas, que se aplica en bloque a la
+hoja. Los builders de `tables.py` solo calculan las filas que dependen
+de los datos.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import coordinate_to_tuple, range_boundaries
+from openpyxl.worksheet.datavalidation import DataValidation
+
+
+@dataclass(frozen=True)
+class TemplateSpec:
+    title: str                                     # nombre de la pestaña
+    widths: dict[str, float]                       # columna → ancho
+    merges: tuple[str, ...] = ()                   # rangos "A1:F1"
+    cells: tuple[tuple[str, object, str | None], ...] = ()   # (celda, valor, estilo)
+    heights: dict[int, float] = field(default_factory=dict)
+    # listas desplegables sobre las filas de datos: (formula1, columnas)
+    validations: tuple[tuple[str, tuple[str, ...]], ...] = ()
+
+
+@dataclass(frozen=True)
+class RenderPlan:
+    title: str
+    widths: tuple[tuple[str, float], ...]
+    heights: tuple[tuple[int, float], ...]
+    merges: tuple[tuple[int, int, int, int], ...]            # (fila1, col1, fila2, col2)
+    cells: tuple[tuple[int, int, object, str | None], ...]   # (fila, col, valor, estilo)
+    validations: tuple[tuple[str, tuple[str, ...]], ...]
+
+    def apply(self, ws) -> None:
+        """Aplica la parte fija a una hoja recién creada (estilos ya registrados)."""
+        ws.title = self.title
+        dims = ws.column_dimensions
+        for col, width in self.widths:
+            dims[col].width = width
+        for row, height in self.heights:
+            ws.row_dimensions[row].height = height
+        # primero combinar, luego dar formato a la celda superior izquierda
+        for r1, c1, r2, c2 in self.merges:
+            ws.merge_cells(start_row=r1, start_column=c1, end_row=r2, end_column=c2)
+        for row, col, value, style in self.cells:
+            cell = ws.cell(row, col)
+            if value is not None:
+                cell.value = value
+            if style is not None:
+                cell.style = style
+
+    def add_validations(self, ws, first_row: int, last_row: int) -> None:
+        """Añade las listas desplegables a las filas de datos first_row..last_row."""
+        for formula, cols in self.validations:
+            dv = DataValidation(type="list", formula1=formula)
+            ws.add_data_validation(dv)
+            for col in cols:
+                dv.add(f"{col}{first_row}:{col}{last_row}")
+
+
+def compile_spec(spec: TemplateSpec) -> RenderPlan:
+    merges = []
+    for rng in spec.merges:
+        c1, r1, c2, r2 = range_boundaries(rng)
+        merges.append((r1, c1, r2, c2))
+    return RenderPlan(
+        title=spec.title,
+        widths=tuple(spec.widths.items()),
+        heights=tuple(sorted(spec.heights.items())),
+        merges=tuple(merges),
+        cells=tuple((*coordinate_to_tuple(coord), value, style)
+                    for coord, value, style in spec.cells),
+        validations=spec.validations,
+    )
+
+
+@lru_cache(maxsize=None)
+def render_plan(name: str) -> RenderPlan:
+    """Plan compilado (y cacheado) de la plantilla `name` ('C', 'D', 'E', 'F')."""
+    return compile_spec(TEMPLATES[name])
+
+
+def _widths(values: list[float], first: int = 1) -> dict[str, float]:
+    return {get_column_letter(i): w for i, w in enumerate(values, first)}
+
+
+# ═══════════════════════ C. Desafío para el desarrollo ═══════════════════════
+C_SPEC = TemplateSpec(
+    title="C. Desafío",
+    widths=_widths([22, 35, 22, 22, 32, 15]),
+    merges=("A1:F1", "A2:F2", "A3:F3"),
+    cells=(
+        ("A1", "C. Desafío para el desarrollo", "bid_title"),
+        ("A2", "Instrucciones: Complete las columnas B, E y F.", "bid_note"),
+        ("A3", "¿Cuál es el principal reto de desarrollo que trata de abordar el proyecto?",
+               "bid_bold"),
+        ("A4", "Objetivo General", "bid_hdr_navy_box"),
+        ("B4", "Identificar los supuestos\nprincipales que vinculan los\n"
+               "Objetivos Específicos con el\nObjetivo General", "bid_hdr_cyan_box"),
+        ("C4", "Objetivo Específico", "bid_hdr_navy_box"),
+        ("D4", "Indicadores de\nresultado", "bid_hdr_navy_box"),
+        ("E4", "¿Hay alguna dimensión del\nObjetivo Específico que no tenga\n"
+               "un indicador de resultados?\n[SÍ/NO]", "bid_hdr_navy_box"),
+        ("F4", "Explique", "bid_hdr_navy_box"),
+    ),
+)
+
+# ═══════════════════════ D. Teoría de Cambio (Tabla A fija) ══════════════════
+D_SPEC = TemplateSpec(
+    title="D. Teoría de Cambio",
+    widths=_widths([19] * 17),           # A-O (Tabla A) + separación P-Q; la Tabla B
+                                         # (R en adelante) se dimensiona con los datos
+    merges=("A1:O1", "A2:O2", "G4:K4"),
+    heights={4: 60},
+    cells=(
+        ("A1", "D. Teoría de Cambio", "bid_title_left"),
+        ("A2", "Instrucciones: Por favor llene las secciones A y B (secciones en verde).",
+               "bid_note_left"),
+        ("G4", "A. Cambios en los Productos\n"
+               "Rellene la celda con el valor 1 si alguna de las siguientes opciones "
+               "aplica a cada producto.", "bid_banner_green_left"),
+        # C5, E5 y F5 van rotados (estrictamente verticales)
+        ("A5", "Declaración de componentes", "bid_hdr_blue_left"),
+        ("B5", "ID Componente",              "bid_hdr_blue_left"),
+        ("C5", "ID Producto",                "bid_hdr_blue_rot"),
+        ("D5", "Definición del Producto",    "bid_hdr_blue_left"),
+        ("E5", "Producto Desactivado",       "bid_hdr_dgrey_rot"),
+        ("F5", "Advertencia",                "bid_hdr_blue_rot"),
+        ("G5", "Cancelado o Desactivado",         "bid_hdr_lgreen_left"),
+        ("H5", "Retrasado",                       "bid_hdr_lgreen_left"),
+        ("I5", "Cambio en el Alcance Financiero", "bid_hdr_lgreen_left"),
+        ("J5", "Cambio en el Alcance Físico",     "bid_hdr_lgreen_left"),
+        ("K5", "Nuevo producto",                  "bid_hdr_lgreen_left"),
+        ("L5", "El Producto ha sufrido cambios",  "bid_hdr_dgrey_left"),
+        ("M5", "Para productos con cambios,\nexplique las causas", "bid_hdr_creme_left"),
+        ("N5", "Productos gatilladores\npara logro de resultados", "bid_hdr_dgrey_left"),
+        ("O5", "Para los productos gatilladores,\nidentifique los principales supuestos\n"
+               "para el logro de resultados", "bid_hdr_cyan_left"),
+    ),
+)
+
+# Tabla B de la Teoría de Cambio: primera columna (R) y ancho de sus columnas
+D_MATRIX_COL   = 18
+D_MATRIX_WIDTH = 19
+
+# ═══════════════════════ E. Medición de Resultados ═══════════════════════════
+E_SPEC = TemplateSpec(
+    title="E. Medición",
+    widths=_widths([25, 22, 18, 15, 15, 15, 10, 30,
+                    28, 28, 30, 26, 18, 18, 20, 32, 18, 30]),
+    merges=("A1:R1", "A2:R2", "A3:R3", "I4:R4", "H5:H6",
+            "I5:I6", "J5:J6", "K5:K6", "L5:L6", "R5:R6", "M5:O5", "P5:Q5"),
+    cells=(
+        ("A1", "E. Medición de Resultados", "bid_title"),
+        ("A2", "Instrucciones: complete las columnas H-I y K-R para cada Indicador de Resultado.",
+               "bid_note"),
+        ("A3", "Nota: Los valores corresponden a la Matriz de Resultados reportada en el "
+               "Plan de Arranque.", None),
+        # fila 4
+        ("I4", "Medición de Resultados", "bid_banner_green_dark"),
+        ("H4", None, "bid_fill_white"),
+        # filas 5-6: H (pregunta), I-J (gris), K-L-R (verde claro)
+        ("H5", "¿Cuándo se incluyó el indicador en la Matriz de Resultados?\n"
+               "(seleccione una opción)", "bid_hdr_white"),
+        ("I5", "Medios de Verificación\n(información obtenida de Convergencia)", "bid_hdr_grey"),
+        ("J5", "Observaciones del Indicador\n(información obtenida de Convergencia)", "bid_hdr_grey"),
+        ("K5", "Método de Cálculo\n(explique la metodología)", "bid_hdr_lgreen"),
+        ("L5", "Método de Atribución\n(ej. Antes y Después, Evaluación de Impacto)", "bid_hdr_lgreen"),
+        ("R5", "Otros problemas\no consideraciones de medición", "bid_hdr_lgreen"),
+        # grupos M-O (fuente existente) y P-Q (recolección) + sub-encabezados
+        ("M5", "Si la fuente de datos ya existe", "bid_hdr_lgreen"),
+        ("P5", "Si se recopilarán datos para la evaluación", "bid_hdr_lgreen"),
+        ("M6", "Fuente de Datos\n(definir la fuente de datos)", "bid_hdr_lgreen"),
+        ("N6", "Acceso a Datos\n(definir el proceso para acceder a los datos)", "bid_hdr_lgreen"),
+        ("O6", "Periodicidad de los Datos\n(¿Está alineada a la medición?)", "bid_hdr_lgreen"),
+        ("P6", "Plan de recolección de Datos\n(plan y consideraciones de tiempos)", "bid_hdr_lgreen"),
+        ("Q6", "Responsable\n(definir quién es responsable)", "bid_hdr_lgreen"),
+        # encabezado azul A-G
+        ("A6", "Objetivos Específicos", "bid_hdr_blue"),
+        ("B6", "Indicador de Resultado", "bid_hdr_blue"),
+        ("C6", "Desagregación", "bid_hdr_blue"),
+        ("D6", "Unidad de Medida", "bid_hdr_blue"),
+        ("E6", "Línea de Base", "bid_hdr_blue"),
+        ("F6", "Año Línea de Base", "bid_hdr_blue"),
+        ("G6", "Meta", "bid_hdr_blue"),
+    ),
+)
+
+# ═══════════════════════ F. Resumen y próximos pasos ═════════════════════════
+F_SPEC = TemplateSpec(
+    title="F. Resumen",
+    widths=_widths([25, 28, 20, 18, 18, 20, 15, 10, 22, 28, 28, 10, 22, 28, 28, 28]),
+    merges=("A1:P1", "A2:P2", "A3:P3", "H4:K4", "L4:P4", "H5:K5", "L5:P5"),
+    cells=(
+        ("A1", "F. Resumen y próximos pasos", "bid_title"),
+        ("A2", "Instrucciones: Resuma los principales desafíos (columnas H-P) e identifique "
+               "los próximos pasos.", "bid_note"),
+        ("A3", "Nota: Esta sección debe completarse con la información de Desafíos y "
+               "Acciones potenciales.", None),
+        # banners (filas 4-5)
+        ("H4", "Logro del Resultado (Teoría de Cambio)", "bid_banner_green"),
+        ("L4", "Medición", "bid_banner_green"),
+        ("H5", "Desafíos identificados relacionados al logro de los resultados", "bid_hdr_grey"),
+        ("L5", "Desafíos identificados relacionados con la medición de resultados", "bid_hdr_grey"),
+        # encabezados fila 6
+        ("A6", "Objetivos Específicos", "bid_hdr_blue"),
+        ("B6", "Indicadores de Resultado", "bid_hdr_blue"),
+        ("C6", "Desagregación", "bid_hdr_blue"),
+        ("D6", "Unidad de Medida", "bid_hdr_blue"),
+        ("E6", "Línea de Base", "bid_hdr_blue"),
+        ("F6", "Año de Línea de Base", "bid_hdr_blue"),
+        ("G6", "Meta", "bid_hdr_blue"),
+        ("H6", "Si/No\n(Seleccione una opción)", "bid_hdr_grey"),
+        ("I6", "Tipo de desafío\n(Seleccione una opción)", "bid_hdr_grey"),
+        ("J6", "Explique", "bid_hdr_grey"),
+        ("K6", "Soluciones propuestas", "bid_hdr_grey"),
+        ("L6", "Si/No\n(Seleccione una opción)", "bid_hdr_grey"),
+        ("M6", "Tipo de desafío\n(Seleccione una opción)", "bid_hdr_grey"),
+        ("N6", "Explique", "bid_hdr_grey"),
+        ("O6", "¿Se miden todas las dimensiones del Objetivo Específico?", "bid_hdr_grey"),
+        ("P6", "Soluciones propuestas", "bid_hdr_grey"),
+    ),
+    validations=(
+        ('"Sí,No"', ("H", "L")),
+        # Tipo de desafío (Logro)
+        ('"a) Productos no completados o desactivados (no suficientes para alcanzar el resultado),'
+         'b) Productos se completan pero se requiere de más tiempo para alcanzar resultados,'
+         'c) Productos se completan pero no suficientes para alcanzar el resultado,'
+         'd) Otro"', ("I",)),
+        # Tipo de desafío (Medición)
+        ('"a) El indicador y/o su metodología de cálculo no están adecuadamente definidos,'
+         'b) Dificultad para acceder a datos de fuentes existentes,'
+         'c) Dificultad para recopilar nuevos datos por el proyecto,'
+         'd) Otro"', ("M",)),
+    ),
+)
+
+TEMPLATES: dict[str, TemplateSpec] = {"C": C_SPEC, "D": D_SPEC, "E": E_SPEC, "F": F_SPEC}
@@ -0,0 +1,39 @@
+# tests/conftest.py
+"""Libros de entrada mínimos para las pruebas (el paquete es plano: se
+importa desde la raíz del repositorio)."""
+from __future__ import annotations
+
+import io, sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def make_input(results: list[tuple], solutions: list[tuple] = (("Solution", 1, "Comp 1", "C1"),)) -> bytes:
+    """.xlsx con 'SDO & Result Indicators' y 'Solutions & Outputs' (filas sin encabezado)."""
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "SDO & Result Indicators"
+    ws.append(["Element type", "Number", "Name", "ID"])
+    for row in results:
+        ws.append(list(row))
+    ws = wb.create_sheet("Solutions & Outputs")
+    ws.append(["Element type", "Number", "Name", "ID"])
+    for row in solutions:
+        ws.append(list(row))
+    out = io.BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def empty_objective() -> bytes:
+    """El primer Objetivo Específico no tiene indicadores."""
+    return make_input([("General Objective", "1", "GO", "G"),
+                       ("Specific Objective", "1.1", "Sin indicadores", "S1"),
+                       ("Specific Objective", "1.2", "Objetivo dos", "S2"),
+                       ("Result indicator", "1.2.1", "Indicador b", "I2")])
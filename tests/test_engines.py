@@ -0,0 +1,97 @@
+# tests/test_engines.py
+"""
+Los dos motores de salida (builders de openpyxl y sheetml) deben dar
+libros equivalentes: mismos valores, combinaciones, anchos, altos,
+listas desplegables y estilo resuelto de cada celda en C, E, F y D.
+"""
+import io, zipfile
+from copy import copy
+
+import pytest
+from openpyxl import load_workbook
+
+from conftest import make_input
+from pipeline import run_pipeline
+from synthetic import SIZES, make_workbook
+
+SHEETS = ("C. Desafío", "E. Medición", "F. Resumen", "D. Teoría de Cambio")
+
+
+def _style(cell) -> tuple:
+    """Estilo tal como lo ve Excel (no el índice de cellXfs)."""
+    # copy() saca el objeto de estilo del proxy de openpyxl (que no compara por valor)
+    return (cell.style, copy(cell.font), copy(cell.fill), copy(cell.border),
+            copy(cell.alignment), cell.number_format, copy(cell.protection))
+
+
+def _snapshot(xlsx: bytes) -> dict[str, dict]:
+    wb = load_workbook(io.BytesIO(xlsx))
+    return {ws.title: {
+        "values": {c.coordinate: c.value for row in ws.iter_rows() for c in row
+                   if c.value is not None},
+        "styles": {c.coordinate: _style(c) for row in ws.iter_rows() for c in row
+                   if c.has_style},
+        "merges": sorted(str(r) for r in ws.merged_cells.ranges),
+        "widths": {k: d.width for k, d in ws.column_dimensions.items() if d.customWidth},
+        "heights": {k: d.height for k, d in ws.row_dimensions.items() if d.height},
+        "validations": sorted((dv.type, dv.formula1, str(dv.sqref))
+                              for dv in ws.data_validations.dataValidation),
+    } for ws in wb.worksheets}
+
+
+def _assert_equivalent(a: bytes, b: bytes) -> None:
+    sa, sb = _snapshot(a), _snapshot(b)
+    assert list(sa) == list(sb)
+    for title in sa:
+        for part in sa[title]:
+            assert sa[title][part] == sb[title][part], f"{title} · {part}"
+
+
+CASES = {
+    "small": make_workbook(**SIZES["small"]),
+    # el primer Objetivo Específico sin indicadores (y otro en medio)
+    "empty_objective": make_input([
+        ("General Objective", "1", "GO", "G"),
+        ("Specific Objective", "1.1", "Sin indicadores", "S1"),
+        ("Specific Objective", "1.2", "Objetivo dos", "S2"),
+        ("Result indicator", "1.2.1", "Indicador b", "I2"),
+        ("Specific Objective", "1.3", "También vacío", "S3"),
+        ("Specific Objective", "1.4", "Objetivo cuatro", "S4"),
+        ("Result indicator", "1.4.A", "Indicador d", "I4"),
+    ]),
+    # numeraciones vacías (NaN en pandas) y guardadas como número
+    "nan_number": make_input([
+        ("General Objective", None, "GO", "G"),
+        ("Specific Objective", None, "Sin número", "S0"),
+        ("Result indicator", None, "Indicador sin número", "I0"),
+        ("Specific Objective", 1.1, "Objetivo numérico", "S1"),
+        ("Result indicator", "1.1.1", "Indicador a", "I1"),
+        ("Result indicator", None, "Otro sin número", "I2"),
+    ]),
+}
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_engines_are_equivalent(case):
+    data = CASES[case]
+    reference = run_pipeline(data)[1]
+    _assert_equivalent(reference, run_pipeline(data, engine="sheetml")[1])
+    assert set(SHEETS) <= set(load_workbook(io.BytesIO(reference)).sheetnames)
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_engines_are_equivalent_split(case):
+    a = zipfile.ZipFile(io.BytesIO(run_pipeline(CASES[case], split=True)[1]))
+    b = zipfile.ZipFile(io.BytesIO(run_pipeline(CASES[case], split=True, engine="sheetml")[1]))
+    assert a.namelist() == b.namelist()
+    for name in a.namelist():
+        _assert_equivalent(a.read(name), b.read(name))
+
+
+def test_empty_objective_keeps_one_row():
+    wb = load_workbook(io.BytesIO(run_pipeline(CASES["empty_objective"], engine="sheetml")[1]))
+    c, e = wb["C. Desafío"], wb["E. Medición"]
+    assert [c.cell(r, 3).value for r in range(5, 9)] == [
+        "Sin indicadores", "Objetivo dos", "También vacío", "Objetivo cuatro"]
+    assert [e.cell(r, 2).value for r in range(7, 11)] == [None, "Indicador b", None, "Indicador d"]
+    assert c["A9"].value == "Indicador GO 1"
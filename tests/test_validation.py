@@ -0,0 +1,28 @@
+# tests/test_validation.py
+from conftest import make_input
+from validation import validate
+
+
+def test_objective_without_indicators_is_a_problem(empty_objective):
+    report = validate(empty_objective)
+    assert not report.ok
+    assert len(report.problems) == 1
+    assert report.problems[0].row == 3
+    assert "1.1 (Sin indicadores)" in report.problems[0].message
+
+
+def test_numeric_and_single_segment_numbers_are_accepted():
+    report = validate(make_input([("General Objective", 1, "GO", "G"),
+                                  ("Specific Objective", 1.1, "Uno", "S1"),
+                                  ("Result indicator", "1.1.1", "a", "I1"),
+                                  ("Specific Objective", 1.2, "Dos", "S2"),
+                                  ("Result indicator", "1.2.A", "b", "I2"),
+                                  ("Result indicator", "1", "c", "I3")]))
+    assert report.ok and not report.warnings
+
+
+def test_numeric_number_that_may_be_1_10_warns():
+    report = validate(make_input([("Specific Objective", 1.1, "Uno", "S1"),
+                                  ("Result indicator", "1.1.1", "a", "I1"),
+                                  ("Result indicator", "1.10.A", "b", "I2")]))
+    assert [w.row for w in report.warnings] == [2]
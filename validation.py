@@ -0,0 +1,241 @@
+# validation.py
+"""
+Validación previa de un .xlsx subido, antes de leerlo con pandas.
+
+Abre el libro sin pandas (calamine si está instalado, si no openpyxl en
+modo solo lectura/streaming) y comprueba lo mínimo que
+necesitan los builders: que existan las hojas, que la fila de
+encabezados tenga las columnas requeridas y que cada Objetivo Específico
+tenga al menos un indicador de resultado. Tarda milisegundos, así que un
+archivo malo de un lote se rechaza sin ocupar un proceso del pool.
+
+La numeración de objetivos e indicadores (1.2 / 1.2.A) solo genera
+avisos (`report.warnings`): el pipeline acepta cualquier valor. Se avisa
+de numeraciones vacías o no reconocidas y de las
+guardadas como número que son ambiguas (1.1 numérico junto a 1.10.A: en
+Excel 1.10 y 1.1 son el mismo número).
+
+    report = validate(contenido)
+    if not report.ok:
+        print(report.summary())      # "SDO & Result Indicators: falta la columna 'Number' …"
+"""
+from __future__ import annotations
+
+import io, re, time
+from dataclasses import asdict, dataclass, field
+from difflib import get_close_matches
+from pathlib import Path
+
+from pipeline import (READER_ENGINE, SHEET_RESULTS, SHEET_SOLUTIONS, TEMPLATE_INPUTS,
+                      select_templates)
+
+# columnas que leen los builders en cada hoja
+REQUIRED_COLUMNS = {
+    SHEET_RESULTS:   ("Element type", "Number", "Name"),
+    SHEET_SOLUTIONS: ("Element type", "Name", "ID"),
+}
+# filas cuya numeración entra en las plantillas (1.2 → objetivo, 1.2.A → indicador)
+NUMBERED_TYPES = {"Specific Objective", "Result indicator"}
+NUMBER_RE = re.compile(r"^\d+(\.[0-9A-Za-z]+)*$")
+
+MAX_ROWS = 2000                 # filas de datos revisadas por hoja (acota el tiempo)
+MAX_ROW_PROBLEMS = 5            # filas malas que se listan antes de resumir
+
+
+@dataclass
+class Problem:
+    message: str
+    sheet: str | None = None
+    column: str | None = None
+    row: int | None = None      # fila de Excel (1 = encabezados)
+
+    def __str__(self) -> str:
+        where = ": ".join(x for x in (self.sheet, self.row and f"fila {self.row}") if x)
+        return f"{where}: {self.message}" if where else self.message
+
+
+@dataclass
+class ValidationReport:
+    problems: list[Problem] = field(default_factory=list)
+    warnings: list[Problem] = field(default_factory=list)   # no impiden procesar
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    def summary(self) -> str:
+        return "; ".join(map(str, self.problems))
+
+    def as_dict(self) -> dict:
+        return {"ok": self.ok, "seconds": self.seconds,
+                "problems": [asdict(p) for p in self.problems],
+                "warnings": [asdict(p) for p in self.warnings]}
+
+
+class ValidationError(ValueError):
+    """El archivo no tiene la estructura esperada (ver `.report`)."""
+
+    def __init__(self, report: ValidationReport):
+        super().__init__(report.summary())
+        self.report = report
+
+
+# ─────────────────── lectores ──────────────────────────────────────
+class _CalamineBook:
+    def __init__(self, source):
+        from python_calamine import CalamineWorkbook
+        self.wb = (CalamineWorkbook.from_filelike(io.BytesIO(source))
+                   if isinstance(source, (bytes, bytearray))
+                   else CalamineWorkbook.from_path(str(source)))
+        self.sheetnames = self.wb.sheet_names
+
+    def rows(self, sheet: str, max_rows: int):
+        # calamine devuelve "" en las celdas vacías
+        for row in self.wb.get_sheet_by_name(sheet).to_python(nrows=max_rows):
+            yield tuple(None if c == "" else c for c in row)
+
+    def close(self) -> None:
+        self.wb.close()
+
+
+class _OpenpyxlBook:
+    def __init__(self, source):
+        from openpyxl import load_workbook
+        self.wb = load_workbook(io.BytesIO(source) if isinstance(source, (bytes, bytearray))
+                                else Path(source), read_only=True, data_only=True)
+        self.sheetnames = self.wb.sheetnames
+
+    def rows(self, sheet: str, max_rows: int):
+        return self.wb[sheet].iter_rows(max_row=max_rows, values_only=True)
+
+    def close(self) -> None:
+        self.wb.close()
+
+
+def _open(source):
+    return (_CalamineBook if READER_ENGINE == "calamine" else _OpenpyxlBook)(source)
+
+
+# ─────────────────── comprobaciones ────────────────────────────────
+def _header(row) -> list[str]:
+    return [str(c).strip() if c is not None else "" for c in row]
+
+
+def _check_columns(sheet: str, header: list[str], report: ValidationReport) -> None:
+    for col in REQUIRED_COLUMNS[sheet]:
+        if col in header:
+            continue
+        # pandas distingue mayúsculas y espacios: sugerir la columna renombrada
+        near = [h for h in header if h.lower().replace(" ", "") == col.lower().replace(" ", "")]
+        near = near or get_close_matches(col, [h for h in header if h], n=1, cutoff=0.75)
+        hint = f" (¿'{near[0]}'?)" if near else ""
+        report.problems.append(Problem(f"falta la columna '{col}'{hint}", sheet, col, 1))
+
+
+def _check_numbers(rows, header: list[str], report: ValidationReport) -> None:
+    """
+    Objetivos Específicos sin indicadores (problemas) y avisos sobre la
+    numeración de objetivos e indicadores.
+    """
+    i_type, i_num, i_name = (header.index(c) for c in ("Element type", "Number", "Name"))
+    notes: list[tuple[int, str]] = []
+    numeric: list[tuple[int, str, float]] = []      # objetivos guardados como número
+    keys: set[str] = set()                          # prefijos 1.2 escritos como texto
+    objectives: dict[str, tuple[int, object]] = {}  # numeración → (fila, nombre), como build_framework
+    with_indicators: set[str] = set()
+    r = 1
+    for r, row in enumerate(rows, 2):
+        etype = row[i_type] if i_type < len(row) else None
+        if etype not in NUMBERED_TYPES:
+            continue
+        number = row[i_num] if i_num < len(row) else None
+        key = "nan" if number in (None, "") else str(number).strip()   # pandas: vacía → NaN
+        if etype == "Specific Objective":
+            objectives.setdefault(key, (r, row[i_name] if i_name < len(row) else None))
+        else:
+            with_indicators.add(".".join(key.split(".")[:2]))
+        if isinstance(number, (int, float)) and not isinstance(number, bool):
+            if number != int(number):               # 1 es inequívoco; 1.1 puede ser 1.10
+                numeric.append((r, etype, number))
+            continue
+        if isinstance(number, str) and NUMBER_RE.match(number.strip()):
+            keys.add(".".join(number.strip().split(".")[:2]))
+            continue
+        notes.append((r, f"{etype}: " + ("numeración vacía" if number is None else
+                                         f"numeración no reconocida {number!r} "
+                                         "(se espera 1.2 o 1.2.A)")))
+    for r, etype, number in numeric:
+        clash = sorted(k for k in keys if k != str(number) and _as_float(k) == number)
+        if clash:
+            notes.append((r, f"{etype}: numeración {number!r} guardada como número, pero "
+                             f"también aparece {clash[0]!r} como texto (¿1.10 leído como "
+                             "1.1?); escríbala como texto"))
+    # los builders necesitan al menos una fila por objetivo; si la hoja tiene
+    # más de MAX_ROWS filas sus indicadores pueden estar más abajo
+    empty = [] if r > MAX_ROWS else [
+        (row, f"el Objetivo Específico {key}" + (f" ({name})" if name else "")
+              + " no tiene indicadores de resultado")
+        for key, (row, name) in objectives.items() if key not in with_indicators]
+    for row, msg in empty[:MAX_ROW_PROBLEMS]:
+        report.problems.append(Problem(msg, SHEET_RESULTS, "Number", row))
+    if len(empty) > MAX_ROW_PROBLEMS:
+        report.problems.append(Problem(f"… y {len(empty) - MAX_ROW_PROBLEMS} objetivos más sin "
+                                       "indicadores", SHEET_RESULTS, "Number"))
+    for r, msg in sorted(notes)[:MAX_ROW_PROBLEMS]:
+        report.warnings.append(Problem(msg, SHEET_RESULTS, "Number", r))
+    if len(notes) > MAX_ROW_PROBLEMS:
+        report.warnings.append(Problem(f"… y {len(notes) - MAX_ROW_PROBLEMS} filas más con "
+                                       "numeración dudosa", SHEET_RESULTS, "Number"))
+
+
+def _as_float(key: str) -> float | None:
+    try:
+        return float(key)
+    except ValueError:
+        return None
+
+
+def validate(source, templates=None) -> ValidationReport:
+    """
+    Revisa `source` (bytes o ruta de un .xlsx) para las plantillas
+    `templates` (por defecto todas) y devuelve un ValidationReport.
+    Nunca lanza por culpa del archivo: todo queda en `report.problems`.
+    """
+    t0 = time.perf_counter()
+    report = ValidationReport()
+    sheets = dict.fromkeys(s for k in select_templates(templates) for s in TEMPLATE_INPUTS[k])
+    try:
+        wb = _open(source)
+    except Exception as exc:            # cada lector lanza sus propias excepciones
+        report.problems.append(Problem(f"no es un .xlsx válido ({type(exc).__name__})"))
+        report.seconds = time.perf_counter() - t0
+        return report
+    try:
+        for sheet in sheets:
+            if sheet not in wb.sheetnames:
+                near = get_close_matches(sheet, wb.sheetnames, n=1, cutoff=0.6)
+                hint = f" (¿'{near[0]}'?)" if near else ""
+                report.problems.append(Problem(f"falta la hoja '{sheet}'{hint}"))
+                continue
+            rows = iter(wb.rows(sheet, MAX_ROWS + 1))
+            header = _header(next(rows, ()))
+            if not any(header):
+                report.problems.append(Problem("la hoja está vacía", sheet))
+                continue
+            n_before = len(report.problems)
+            _check_columns(sheet, header, report)
+            if sheet == SHEET_RESULTS and len(report.problems) == n_before:
+                _check_numbers(rows, header, report)
+    finally:
+        wb.close()
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+def check(source, templates=None) -> ValidationReport:
+    """Como `validate`, pero lanza ValidationError si hay problemas."""
+    report = validate(source, templates)
+    if not report.ok:
+        raise ValidationError(report)
+    return report
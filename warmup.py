@@ -0,0 +1,34 @@
+# warmup.py
+"""
+Calentamiento opcional al arrancar (BID_WARMUP=1).
+
+El primer `run_pipeline` de un proceso paga la importación de pandas,
+openpyxl y calamine y el primer uso de sus rutas internas (y de
+`templates.render_plan`). Aquí se hace ese trabajo por adelantado con un
+libro sintético mínimo: en un hilo del proceso principal y en cada
+proceso del pool.
+"""
+import threading, time
+from concurrent.futures import Executor, Future
+
+
+def warm_up() -> float:
+    """Procesa un libro sintético 'tiny' y devuelve los segundos que tardó."""
+    from pipeline import run_pipeline
+    from synthetic import SIZES, make_workbook
+
+    t0 = time.perf_counter()
+    run_pipeline(make_workbook(**SIZES["tiny"]))
+    return time.perf_counter() - t0
+
+
+def warm_pool(pool: Executor, workers: int) -> list[Future]:
+    """Una tarea de calentamiento por proceso (así el pool los arranca todos)."""
+    return [pool.submit(warm_up) for _ in range(workers)]
+
+
+def warm_in_background() -> threading.Thread:
+    """Calienta el proceso actual sin bloquear al llamador."""
+    t = threading.Thread(target=warm_up, name="bid-warmup", daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,149 @@
+# writer.py
+"""
+Escritura del paquete .xlsx con DEFLATE en paralelo y nivel ajustable.
+
+`wb.save` de openpyxl comprime cada parte XML en serie y con el nivel por
+defecto de zlib. Aquí openpyxl escribe el paquete sin comprimir y después
+las partes se comprimen en un pool de hilos (zlib libera el GIL). Las
+partes grandes se trocean como hace pigz: cada trozo usa como diccionario
+los últimos 32 KB del anterior, así que el tamaño apenas cambia.
+
+    PRESETS = fast (1) · balanced (6, como openpyxl) · smallest (6 y 9)
+
+zlib no siempre comprime más con 9 (en hojas muy repetitivas el 6 gana),
+así que "smallest" prueba ambos niveles en cada trozo y se queda con el
+menor.
+
+    data = save_workbook(wb, "fast")
+"""
+from __future__ import annotations
+
+import io, os, struct, zipfile, zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from openpyxl.writer.excel import ExcelWriter
+
+PRESETS = {"fast": (1,), "balanced": (6,), "smallest": (6, 9)}
+DEFAULT = "balanced"
+
+CHUNK = 256 * 1024              # trozo de una parte grande (unidad de trabajo del pool)
+WINDOW = 32 * 1024              # ventana de DEFLATE: diccionario de cada trozo
+
+_LOCAL = struct.Struct("<4s5H3L2H")
+_CENTRAL = struct.Struct("<4s6H3L5H2L")
+_END = struct.Struct("<4s4H2LH")
+
+
+def resolve_levels(compression) -> tuple[int, ...]:
+    """'fast' | 'balanced' | 'smallest' | 0-9 → niveles de zlib a probar (0 = sin comprimir)."""
+    if isinstance(compression, str) and not compression.isdigit():
+        try:
+            return PRESETS[compression.lower()]
+        except KeyError:
+            raise ValueError(f"compresión desconocida: {compression!r} "
+                             f"(válidas: {', '.join(PRESETS)} o 0-9)") from None
+    level = int(compression)
+    if not 0 <= level <= 9:
+        raise ValueError(f"el nivel de compresión va de 0 a 9 (recibido {level})")
+    return (level,)
+
+
+@lru_cache(maxsize=None)
+def _pool(workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(workers, thread_name_prefix="bid-deflate")
+
+
+def default_workers() -> int:
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+# ─────────────────── DEFLATE ───────────────────────────────────────
+def _deflate_chunk(data: memoryview, levels: tuple[int, ...], zdict: bytes | None,
+                   last: bool) -> bytes:
+    best = None
+    for level in levels:
+        c = (zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict) if zdict
+             else zlib.compressobj(level, zlib.DEFLATED, -15))
+        # Z_SYNC_FLUSH cierra el trozo en un límite de byte: los trozos se concatenan
+        out = c.compress(data) + c.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+        if best is None or len(out) < len(best):
+            best = out
+    return best
+
+
+def _deflate(data: bytes, levels: tuple[int, ...], pool) -> list:
+    """La parte en DEFLATE crudo, por trozos: futures del pool (o bytes si no hay pool)."""
+    if pool is None:
+        return [_deflate_chunk(memoryview(data), levels, None, True)]
+    view, jobs = memoryview(data), []
+    for s in range(0, max(len(data), 1), CHUNK):
+        zdict = bytes(view[max(0, s - WINDOW):s]) or None
+        jobs.append(pool.submit(_deflate_chunk, view[s:s + CHUNK], levels, zdict,
+                                s + CHUNK >= len(data)))
+    return jobs
+
+
+# ─────────────────── ZIP ───────────────────────────────────────────
+def _dos_time(date_time) -> tuple[int, int]:
+    y, mo, d, h, mi, s = date_time
+    return ((h << 11) | (mi << 5) | (s // 2)), (((max(y, 1980) - 1980) << 9) | (mo << 5) | d)
+
+
+def write_zip(parts: list[tuple[zipfile.ZipInfo, bytes]], *, compression=DEFAULT,
+              workers: int | None = None) -> bytes:
+    """
+    Empaqueta [(ZipInfo, contenido sin comprimir)] en un ZIP. Con `workers`
+    > 1 las partes (y sus trozos) se comprimen en paralelo; el orden de las
+    partes se conserva.
+    """
+    levels = resolve_levels(compression)
+    stored = levels == (0,)
+    workers = workers or default_workers()
+    pool = _pool(workers) if workers > 1 and not stored else None
+    method = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+    # se encola todo primero y se recoge en orden
+    pending = [(info, data, [data] if stored else _deflate(data, levels, pool))
+               for info, data in parts]
+
+    out, central = io.BytesIO(), []
+    for info, data, jobs in pending:
+        payload = b"".join(j if isinstance(j, bytes) else j.result() for j in jobs)
+        name = info.filename.encode("utf-8")
+        flags = 0x800 if not name.isascii() else 0
+        dtime, ddate = _dos_time(info.date_time)
+        crc, offset = zlib.crc32(data), out.tell()
+        if offset + len(payload) > 0xFFFFFFFF:
+            raise ValueError("el paquete supera 4 GB (ZIP64 no soportado)")
+        out.write(_LOCAL.pack(b"PK\x03\x04", 20, flags, method, dtime, ddate,
+                              crc, len(payload), len(data), len(name), 0))
+        out.write(name)
+        out.write(payload)
+        central.append(_CENTRAL.pack(b"PK\x01\x02", 20, 20, flags, method, dtime, ddate,
+                                     crc, len(payload), len(data), len(name), 0, 0, 0, 0,
+                                     info.external_attr, offset) + name)
+    start = out.tell()
+    for entry in central:
+        out.write(entry)
+    out.write(_END.pack(b"PK\x05\x06", 0, 0, len(central), len(central),
+                        out.tell() - start, start, 0))
+    return out.getvalue()
+
+
+def repack(package: bytes, *, compression=DEFAULT, workers: int | None = None,
+           replace: dict[str, bytes] | None = None) -> bytes:
+    """Vuelve a escribir un ZIP con otro nivel (y, opcionalmente, partes sustituidas)."""
+    replace = replace or {}
+    with zipfile.ZipFile(io.BytesIO(package)) as src:
+        parts = [(info, replace[info.filename] if info.filename in replace
+                       else src.read(info.filename)) for info in src.infolist()]
+    return write_zip(parts, compression=compression, workers=workers)
+
+
+def save_workbook(wb, compression=DEFAULT, workers: int | None = None) -> bytes:
+    """Equivalente a `wb.save(BytesIO())` con compresión en paralelo y nivel a elegir."""
+    raw = io.BytesIO()
+    wb.properties.modified = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+    ExcelWriter(wb, zipfile.ZipFile(raw, "w", zipfile.ZIP_STORED)).save()
+    return repack(raw.getvalue(), compression=compression, workers=workers)